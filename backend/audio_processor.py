@@ -3,7 +3,10 @@ Audio processing utilities for handling audio chunks.
 """
 
 import struct
-from typing import List, Tuple
+from abc import ABC, abstractmethod
+from typing import List, Tuple, Optional
+
+import numpy as np
 
 
 def parse_audio_chunk(audio_bytes: bytes, sample_rate: int = 16000, channels: int = 1) -> List[float]:
@@ -27,6 +30,25 @@ def parse_audio_chunk(audio_bytes: bytes, sample_rate: int = 16000, channels: in
     return float_samples
 
 
+def chunk_level_db(audio_bytes: bytes) -> float:
+    """
+    RMS level of a PCM 16-bit chunk in dBFS.
+    
+    Args:
+        audio_bytes: Binary audio data (PCM 16-bit format)
+    
+    Returns:
+        Level in dBFS (-120.0 for an empty or silent chunk)
+    """
+    samples = np.frombuffer(audio_bytes, dtype='<i2', count=len(audio_bytes) // 2)
+    if samples.size == 0:
+        return -120.0
+    mean_square = float(np.dot(samples.astype(np.float32), samples.astype(np.float32))) / samples.size
+    if mean_square <= 0.0:
+        return -120.0
+    return float(10.0 * np.log10(mean_square / (32768.0 * 32768.0)))
+
+
 def get_audio_info(audio_bytes: bytes, sample_rate: int = 16000, channels: int = 1) -> dict:
     """
     Get information about an audio chunk.
@@ -51,3 +73,534 @@ def get_audio_info(audio_bytes: bytes, sample_rate: int = 16000, channels: int =
         "format": "PCM 16-bit",
     }
 
+
+
+# ---------------------------------------------------------------------------
+# Ingest codecs
+#
+# The browser can send compressed audio instead of raw PCM 16-bit. Every
+# decoder turns incoming frames back into PCM 16-bit (what Hume expects)
+# and carries its state across frames, so a frame boundary can fall
+# anywhere in the stream.
+# ---------------------------------------------------------------------------
+
+def _build_ulaw_table() -> np.ndarray:
+    """G.711 mu-law code -> linear PCM 16-bit lookup table."""
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(sign != 0, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_alaw_table() -> np.ndarray:
+    """G.711 A-law code -> linear PCM 16-bit lookup table."""
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    segment = (codes & 0x70) >> 4
+    magnitude = ((codes & 0x0F) << 4) + 8
+    magnitude = np.where(segment >= 1, magnitude + 0x100, magnitude)
+    magnitude = np.where(segment >= 2, magnitude << np.maximum(segment - 1, 0), magnitude)
+    return np.where(codes & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+ULAW_TABLE = _build_ulaw_table()
+ALAW_TABLE = _build_alaw_table()
+
+IMA_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8]
+IMA_STEP_TABLE = [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+]
+
+
+def _build_ima_tables() -> Tuple[list, np.ndarray]:
+    """
+    Build the IMA-ADPCM lookup tables.
+
+    Returns:
+        Tuple of (next step index for index*16+code as a flat list,
+        signed predictor delta for [index, code] as an int32 array)
+    """
+    next_index = []
+    deltas = np.zeros((len(IMA_STEP_TABLE), 16), dtype=np.int32)
+    for index, step in enumerate(IMA_STEP_TABLE):
+        for code in range(16):
+            next_index.append(min(max(index + IMA_INDEX_TABLE[code], 0), 88))
+            diff = step >> 3
+            if code & 4:
+                diff += step
+            if code & 2:
+                diff += step >> 1
+            if code & 1:
+                diff += step >> 2
+            deltas[index, code] = -diff if code & 8 else diff
+    return next_index, deltas
+
+
+IMA_NEXT_INDEX, IMA_DELTA_TABLE = _build_ima_tables()
+
+
+class AudioDecoder(ABC):
+    """Base class for stateful ingest decoders producing PCM 16-bit."""
+
+    codec: str
+    bits_per_sample: int
+
+    @abstractmethod
+    def decode(self, data: bytes) -> np.ndarray:
+        """
+        Decode one frame.
+        
+        Args:
+            data: Encoded audio frame
+        
+        Returns:
+            int16 NumPy array of decoded samples
+        """
+
+    def decode_bytes(self, data: bytes) -> bytes:
+        """Decode one frame to little-endian PCM 16-bit bytes."""
+        return self.decode(data).astype('<i2', copy=False).tobytes()
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Memory held between frames."""
+        return 0
+
+
+class PCM16Decoder(AudioDecoder):
+    """Pass-through for raw PCM 16-bit; keeps an odd trailing byte for the next frame."""
+
+    codec = "pcm16"
+    bits_per_sample = 16
+
+    def __init__(self):
+        self._carry = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if self._carry:
+            data = self._carry + data
+            self._carry = b""
+        if len(data) % 2:
+            self._carry = data[-1:]
+            data = data[:-1]
+        return np.frombuffer(data, dtype='<i2')
+
+    def decode_bytes(self, data: bytes) -> bytes:
+        # Already in the upstream format; avoid a round trip through NumPy
+        if not self._carry and len(data) % 2 == 0:
+            return data
+        return super().decode_bytes(data)
+
+    @property
+    def buffer_bytes(self) -> int:
+        return len(self._carry)
+
+
+class G711Decoder(AudioDecoder):
+    """Table-driven G.711 (mu-law / A-law) 8-bit decoder."""
+
+    bits_per_sample = 8
+
+    def __init__(self, codec: str, table: np.ndarray):
+        self.codec = codec
+        self._table = table
+
+    def decode(self, data: bytes) -> np.ndarray:
+        return self._table[np.frombuffer(data, dtype=np.uint8)]
+
+
+class ImaAdpcmDecoder(AudioDecoder):
+    """
+    Streaming IMA-ADPCM 4-bit decoder (low nibble first, no block headers).
+
+    The step index walk is inherently sequential, so it runs as a tight
+    table lookup loop; the predictor deltas and their accumulation are
+    vectorized with NumPy.
+    """
+
+    codec = "ima_adpcm"
+    bits_per_sample = 4
+
+    def __init__(self):
+        self.predictor = 0
+        self.step_index = 0
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if not data:
+            return np.zeros(0, dtype=np.int16)
+        packed = np.frombuffer(data, dtype=np.uint8)
+        codes = np.empty(packed.size * 2, dtype=np.uint8)
+        codes[0::2] = packed & 0x0F
+        codes[1::2] = packed >> 4
+
+        # Step index in effect for each sample
+        next_index = IMA_NEXT_INDEX
+        index = self.step_index
+        walk = [index]
+        append = walk.append
+        for code in codes.tolist():
+            index = next_index[index * 16 + code]
+            append(index)
+        self.step_index = walk.pop()
+        indices = np.array(walk, dtype=np.intp)
+
+        deltas = IMA_DELTA_TABLE[indices, codes]
+        samples = np.cumsum(deltas, dtype=np.int64) + self.predictor
+        if samples.min() < -32768 or samples.max() > 32767:
+            self._clamp_accumulated(samples, deltas)
+        self.predictor = int(samples[-1])
+        return samples.astype(np.int16)
+
+    _MAX_VECTOR_FIXUPS = 16
+
+    def _clamp_accumulated(self, samples: np.ndarray, deltas: np.ndarray):
+        """Apply the predictor's saturation to an unclamped running sum, in place."""
+        # Each saturation shifts everything after it by a constant, so a few
+        # clipped peaks are fixed up with vectorized offsets
+        start = 0
+        for _ in range(self._MAX_VECTOR_FIXUPS):
+            tail = samples[start:]
+            over = np.flatnonzero((tail < -32768) | (tail > 32767))
+            if over.size == 0:
+                return
+            k = start + int(over[0])
+            value = int(samples[k])
+            samples[k:] += min(max(value, -32768), 32767) - value
+            start = k + 1
+        # Heavily clipped frame: finish sequentially
+        predictor = int(samples[start - 1])
+        for i, delta in enumerate(deltas[start:].tolist(), start):
+            predictor = min(max(predictor + delta, -32768), 32767)
+            samples[i] = predictor
+
+
+SUPPORTED_CODECS = ("pcm16", "mulaw", "alaw", "ima_adpcm")
+DEFAULT_CODEC = "pcm16"
+# Codecs that code each sample independently and so can carry interleaved channels
+INTERLEAVABLE_CODECS = ("pcm16", "mulaw", "alaw")
+
+
+def create_decoder(codec: Optional[str] = None) -> AudioDecoder:
+    """
+    Create a fresh decoder for an ingest codec.
+    
+    Args:
+        codec: One of SUPPORTED_CODECS (default: pcm16)
+    
+    Returns:
+        Stateful AudioDecoder for a single stream
+    """
+    codec = (codec or DEFAULT_CODEC).lower()
+    if codec == "pcm16":
+        return PCM16Decoder()
+    if codec == "mulaw":
+        return G711Decoder("mulaw", ULAW_TABLE)
+    if codec == "alaw":
+        return G711Decoder("alaw", ALAW_TABLE)
+    if codec == "ima_adpcm":
+        return ImaAdpcmDecoder()
+    raise ValueError(f"Unsupported audio codec: {codec}. Supported: {', '.join(SUPPORTED_CODECS)}")
+
+
+class ChannelDemuxer:
+    """
+    Splits interleaved multi-channel samples into per-channel views.
+    
+    The views are strided slices of the decoded buffer (no copy). Samples
+    that do not complete a multi-channel frame are carried to the next call.
+    """
+
+    def __init__(self, channels: int):
+        if channels < 1:
+            raise ValueError("channels must be >= 1")
+        self.channels = channels
+        self._carry = np.zeros(0, dtype=np.int16)
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Memory held between frames."""
+        return self._carry.nbytes
+
+    def split(self, samples: np.ndarray) -> List[np.ndarray]:
+        """
+        Args:
+            samples: Interleaved int16 samples (L R L R ... for stereo)
+        
+        Returns:
+            One int16 array per channel, in channel order
+        """
+        if self.channels == 1:
+            return [samples]
+        if self._carry.size:
+            samples = np.concatenate((self._carry, samples))
+        usable = samples.size - samples.size % self.channels
+        self._carry = samples[usable:].copy()
+        frames = samples[:usable].reshape(-1, self.channels)
+        return [frames[:, channel] for channel in range(self.channels)]
+
+
+# ---------------------------------------------------------------------------
+# Streaming prosody pre-analysis
+#
+# Hume's emotion scores only arrive with user_message, after an utterance
+# ends. ProsodyAnalyzer derives cheap provisional arousal/agitation hints
+# from pitch, energy and speaking rate on every frame so the agent UI can
+# react mid-utterance; reconcile() calibrates them against Hume's scores.
+# ---------------------------------------------------------------------------
+
+# Hume prosody emotions that indicate high / low arousal
+HIGH_AROUSAL_EMOTIONS = ("Anger", "Anxiety", "Distress", "Excitement", "Fear", "Horror", "Surprise (negative)", "Annoyance")
+LOW_AROUSAL_EMOTIONS = ("Calmness", "Boredom", "Tiredness", "Contentment", "Satisfaction")
+AGITATION_EMOTIONS = ("Anger", "Annoyance", "Contempt", "Disgust", "Distress")
+
+
+def _sigmoid(x: float) -> float:
+    return float(1.0 / (1.0 + np.exp(-x)))
+
+
+class ProsodyAnalyzer:
+    """
+    Streaming pitch / energy / speaking-rate analysis for one audio stream.
+    
+    Frames are analysed in vectorized batches: energy per frame, pitch by a
+    YIN-style cumulative mean normalized difference computed from an FFT
+    autocorrelation (refined to a sub-sample lag by parabolic
+    interpolation), and a speaking-rate proxy from syllable-like energy
+    peaks over the last couple of seconds.
+    """
+
+    FRAME = 512        # 32 ms at 16 kHz
+    HOP = 256          # 16 ms at 16 kHz
+    MIN_F0 = 70.0
+    MAX_F0 = 400.0
+    YIN_THRESHOLD = 0.15
+    SILENCE_DB = -50.0
+
+    def __init__(self, sample_rate: int = 16000, emit_interval: float = 0.1, history_seconds: float = 2.0):
+        """
+        Args:
+            sample_rate: Sample rate of incoming PCM (default: 16000)
+            emit_interval: Minimum audio time between emitted hints (seconds)
+            history_seconds: Window used for speaking rate and variability
+        """
+        self.sample_rate = sample_rate
+        self.emit_interval = emit_interval
+        self._min_lag = int(sample_rate / self.MAX_F0)
+        self._max_lag = int(sample_rate / self.MIN_F0)
+        self._fft_size = 1 << int(np.ceil(np.log2(self.FRAME * 2)))
+        self._window = np.hanning(self.FRAME).astype(np.float32)
+        # The window's own autocorrelation tapers with lag and would pull
+        # the difference function's dips towards shorter lags (higher f0)
+        window_spectrum = np.fft.rfft(self._window, n=self._fft_size)
+        window_acf = np.fft.irfft(np.abs(window_spectrum) ** 2, n=self._fft_size)[:self._max_lag + 2]
+        self._window_acf = (window_acf / window_acf[0]).astype(np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        history_frames = int(history_seconds * sample_rate / self.HOP)
+        # Ring buffers of per-frame features: energy (dB), f0 (Hz, 0 = unvoiced)
+        self._energy = np.full(history_frames, self.SILENCE_DB * 2, dtype=np.float32)
+        self._f0 = np.zeros(history_frames, dtype=np.float32)
+        self._frames_seen = 0
+        self._since_emit = 0.0
+        # Slow session baselines (mean / variance) for normalisation
+        self._baseline = {"energy": [-35.0, 100.0], "f0": [160.0, 1600.0], "rate": [3.0, 4.0]}
+        self._previous = None
+        # Reconciliation against Hume's authoritative scores
+        self.calibration_offset = 0.0
+        self._provisional_sum = 0.0
+        self._provisional_count = 0
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Memory held by the analyzer's buffers."""
+        return (self._pending.nbytes + self._energy.nbytes + self._f0.nbytes
+                + self._window.nbytes + self._window_acf.nbytes)
+
+    def update(self, samples: np.ndarray) -> Optional[dict]:
+        """
+        Feed PCM 16-bit samples and return a provisional hint when one is due.
+        
+        Args:
+            samples: int16 NumPy array (or PCM 16-bit bytes) of new samples
+        
+        Returns:
+            Hint dictionary at most once per emit_interval of audio, otherwise None
+        """
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype='<i2')
+        if samples.size == 0:
+            return None
+        audio = np.concatenate((self._pending, samples.astype(np.float32) / 32768.0))
+        n_frames = 0 if audio.size < self.FRAME else 1 + (audio.size - self.FRAME) // self.HOP
+        if n_frames == 0:
+            self._pending = audio
+            return None
+        frames = np.lib.stride_tricks.sliding_window_view(audio, self.FRAME)[::self.HOP][:n_frames]
+        self._pending = audio[n_frames * self.HOP:]
+
+        energy_db, f0 = self._analyse_frames(frames)
+        self._push(energy_db, f0)
+
+        self._since_emit += n_frames * self.HOP / self.sample_rate
+        if self._since_emit < self.emit_interval:
+            return None
+        self._since_emit = 0.0
+        return self._hint()
+
+    def _analyse_frames(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Energy (dB) and f0 (Hz, 0 when unvoiced) for a batch of frames."""
+        rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+        energy_db = 20.0 * np.log10(rms)
+
+        # Autocorrelation via FFT, then YIN cumulative mean normalized difference
+        centered = (frames - frames.mean(axis=1, keepdims=True)) * self._window
+        spectrum = np.fft.rfft(centered, n=self._fft_size, axis=1)
+        acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=self._fft_size, axis=1)[:, :self._max_lag + 2]
+        acf /= self._window_acf
+        diff = np.maximum(2.0 * (acf[:, :1] - acf), 0.0)
+        lags = np.arange(diff.shape[1], dtype=np.float32)
+        cumulative = np.cumsum(diff[:, 1:], axis=1)
+        cmnd = np.ones_like(diff)
+        cmnd[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(cumulative, 1e-12)
+
+        rows = np.arange(frames.shape[0])
+        search = cmnd[:, self._min_lag:self._max_lag + 1]
+        below = search < self.YIN_THRESHOLD
+        # Bottom of the first dip under the threshold (follow it while it
+        # keeps falling), else the global minimum
+        first = below.argmax(axis=1)
+        stops = (search[:, 1:] >= search[:, :-1]) & (np.arange(search.shape[1] - 1) >= first[:, None])
+        bottom = np.where(stops.any(axis=1), stops.argmax(axis=1), search.shape[1] - 1)
+        index = np.where(below.any(axis=1), bottom, search.argmin(axis=1)) + self._min_lag
+        best = cmnd[rows, index]
+
+        # Parabolic interpolation around the minimum for a sub-sample lag
+        before, after = cmnd[rows, index - 1], cmnd[rows, index + 1]
+        curvature = before - 2.0 * best + after
+        shift = np.where(curvature > 1e-12, 0.5 * (before - after) / np.maximum(curvature, 1e-12), 0.0)
+        lag = index + np.clip(shift, -0.5, 0.5)
+
+        voiced = (best < 0.35) & (energy_db > self.SILENCE_DB)
+        f0 = np.where(voiced, self.sample_rate / np.maximum(lag, 1.0), 0.0).astype(np.float32)
+        return energy_db.astype(np.float32), f0
+
+    def _push(self, energy_db: np.ndarray, f0: np.ndarray):
+        n = min(energy_db.size, self._energy.size)
+        self._energy = np.roll(self._energy, -n)
+        self._f0 = np.roll(self._f0, -n)
+        self._energy[-n:] = energy_db[-n:]
+        self._f0[-n:] = f0[-n:]
+        self._frames_seen += energy_db.size
+
+    def _speaking_rate(self) -> float:
+        """Syllable-like energy peaks per second over the history window."""
+        e = self._energy[-min(self._frames_seen, self._energy.size):]
+        if e.size < 3:
+            return 0.0
+        floor = max(self.SILENCE_DB, float(np.median(e)))
+        peaks = (e[1:-1] > e[:-2]) & (e[1:-1] >= e[2:]) & (e[1:-1] > floor + 3.0)
+        seconds = e.size * self.HOP / self.sample_rate
+        return float(np.count_nonzero(peaks)) / seconds
+
+    def _update_baseline(self, name: str, value: float, alpha: float = 0.02):
+        mean, var = self._baseline[name]
+        delta = value - mean
+        mean += alpha * delta
+        var = (1 - alpha) * (var + alpha * delta * delta)
+        self._baseline[name] = [mean, var]
+
+    def _z(self, name: str, value: float) -> float:
+        mean, var = self._baseline[name]
+        return (value - mean) / float(np.sqrt(max(var, 1e-6)))
+
+    def _hint(self) -> dict:
+        recent = min(max(1, int(0.3 * self.sample_rate / self.HOP)), self._frames_seen)  # ~300 ms
+        energy = float(self._energy[-recent:].mean())
+        voiced_f0 = self._f0[-recent:][self._f0[-recent:] > 0]
+        history_f0 = self._f0[self._f0 > 0]
+        pitch = float(voiced_f0.mean()) if voiced_f0.size else 0.0
+        pitch_var = float(history_f0.std() / max(history_f0.mean(), 1.0)) if history_f0.size > 2 else 0.0
+        rate = self._speaking_rate()
+        speaking = voiced_f0.size > 0 and energy > self.SILENCE_DB
+
+        z_energy = self._z("energy", energy)
+        z_pitch = self._z("f0", pitch) if pitch else 0.0
+        z_rate = self._z("rate", rate)
+        if speaking:
+            self._update_baseline("energy", energy)
+            self._update_baseline("f0", pitch)
+            self._update_baseline("rate", rate)
+
+        arousal = _sigmoid(0.6 * z_energy + 0.4 * z_pitch + 0.25 * z_rate + self.calibration_offset) if speaking else 0.0
+        previous = self._previous or {"energy_db": energy, "pitch_hz": pitch, "arousal": arousal}
+        energy_delta = energy - previous["energy_db"]
+        agitation = _sigmoid(0.8 * z_energy + 0.5 * max(energy_delta, 0.0) / 3.0 + 3.0 * (pitch_var - 0.15)
+                             + self.calibration_offset) if speaking else 0.0
+
+        if speaking:
+            self._provisional_sum += arousal
+            self._provisional_count += 1
+
+        hint = {
+            "provisional": True,
+            "speaking": bool(speaking),
+            "arousal": round(arousal, 3),
+            "agitation": round(agitation, 3),
+            "pitch_hz": round(pitch, 1),
+            "energy_db": round(energy, 1),
+            "speaking_rate": round(rate, 2),
+            "deltas": {
+                "energy_db": round(energy_delta, 2),
+                "pitch_hz": round(pitch - previous["pitch_hz"], 1) if pitch and previous["pitch_hz"] else 0.0,
+                "arousal": round(arousal - previous["arousal"], 3),
+            },
+            "stream_time": round(self._frames_seen * self.HOP / self.sample_rate, 3),
+        }
+        self._previous = {"energy_db": energy, "pitch_hz": pitch, "arousal": arousal}
+        return hint
+
+    def reconcile(self, emotions: dict, rate: float = 0.3) -> dict:
+        """
+        Reconcile provisional hints with Hume's authoritative emotion scores.
+        
+        Nudges the calibration offset so later provisional arousal tracks
+        what Hume reported for the utterance just finished.
+        
+        Args:
+            emotions: Hume prosody scores (emotion name -> score)
+            rate: How far to move the calibration per utterance (0-1)
+        
+        Returns:
+            Dictionary with authoritative arousal/agitation and the calibration
+        """
+        def mean_score(names):
+            values = [emotions[name] for name in names if isinstance(emotions.get(name), (int, float))]
+            return float(np.mean(values)) if values else 0.0
+
+        high, low = mean_score(HIGH_AROUSAL_EMOTIONS), mean_score(LOW_AROUSAL_EMOTIONS)
+        authoritative_arousal = float(np.clip(0.5 + 2.0 * (high - low), 0.0, 1.0))
+        authoritative_agitation = float(np.clip(3.0 * mean_score(AGITATION_EMOTIONS), 0.0, 1.0))
+
+        provisional = self._provisional_sum / self._provisional_count if self._provisional_count else None
+        if provisional is not None:
+            # Move in logit space so the correction composes with the sigmoid
+            eps = 1e-3
+            target = np.log((authoritative_arousal + eps) / (1 - authoritative_arousal + eps))
+            current = np.log((provisional + eps) / (1 - provisional + eps))
+            self.calibration_offset = float(np.clip(self.calibration_offset + rate * (target - current), -3.0, 3.0))
+        self._provisional_sum = 0.0
+        self._provisional_count = 0
+
+        return {
+            "provisional": False,
+            "arousal": round(authoritative_arousal, 3),
+            "agitation": round(authoritative_agitation, 3),
+            "provisional_arousal": round(provisional, 3) if provisional is not None else None,
+            "calibration_offset": round(self.calibration_offset, 3),
+        }
@@ -0,0 +1,47 @@
+"""
+Benchmarks for audio parsing and ingest decoding.
+"""
+
+import time
+
+from audio_processor import parse_audio_chunk, get_audio_info, create_decoder, SUPPORTED_CODECS
+
+from harness import perf_counter_loop
+from codec_decode import _speech_like_signal, encode_stream, frame_bytes
+
+# 10 ms, one downsampled browser buffer (1365 samples), 256 ms and 1 s of PCM16
+CHUNK_SIZES = (320, 2730, 8192, 32000)
+
+
+def _pcm_chunk(size: int) -> bytes:
+    samples = _speech_like_signal(1.0)
+    return samples.astype('<i2').tobytes()[:size]
+
+
+def cases(quick: bool = False):
+    """Yield (name, run, params) for each benchmark case."""
+    for size in CHUNK_SIZES:
+        chunk = _pcm_chunk(size)
+        yield f"audio.parse_audio_chunk[{size}B]", perf_counter_loop(lambda c=chunk: parse_audio_chunk(c)), {"bytes": size}
+        yield f"audio.get_audio_info[{size}B]", perf_counter_loop(lambda c=chunk: get_audio_info(c)), {"bytes": size}
+
+    # Decoders carry state across frames, so one operation is one frame of a
+    # continuous stream; the decoder restarts whenever the stream wraps around
+    encoded_seconds = 2.0 if quick else 10.0
+    signal = _speech_like_signal(encoded_seconds)
+    for codec in SUPPORTED_CODECS:
+        encoded = encode_stream(codec, signal)
+        step = frame_bytes(codec)
+        frames = [encoded[i:i + step] for i in range(0, len(encoded) - step + 1, step)]
+
+        def run(number: int, codec=codec, frames=frames) -> float:
+            count = len(frames)
+            decoder = create_decoder(codec)
+            start = time.perf_counter()
+            for i in range(number):
+                if i and i % count == 0:
+                    decoder = create_decoder(codec)
+                decoder.decode_bytes(frames[i % count])
+            return time.perf_counter() - start
+
+        yield f"decode.{codec}[frame]", run, {"codec": codec, "bytes": step}
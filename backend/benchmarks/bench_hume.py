@@ -0,0 +1,99 @@
+"""
+Benchmarks for HumeAIClient send and receive paths, without a network.
+
+send_audio runs against a no-op stream (base64 + AudioInput serialization,
+level detection and logging are what is measured). _process_message runs
+on recorded EVI payloads from fixtures/hume_messages.json, both as plain
+dicts and as the SDK models the stream actually yields.
+"""
+
+import os
+import json
+import time
+import asyncio
+
+from hume_client import HumeAIClient
+
+from harness import quiet_stdout
+from codec_decode import _speech_like_signal
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "hume_messages.json")
+
+# One downsampled browser buffer, 100 ms and 500 ms of PCM16
+SEND_SIZES = (2730, 3200, 16000)
+
+
+class NoOpStream:
+    """Stands in for the EVI socket; accepts and discards every message."""
+
+    async def send_audio_input(self, message):
+        return None
+
+
+def load_fixtures() -> dict:
+    with open(FIXTURES) as f:
+        return json.load(f)
+
+
+def _as_sdk_model(payload: dict):
+    # The EVI stream yields pydantic models; fall back to the dict if the
+    # installed SDK cannot parse the recorded payload
+    try:
+        from hume.empathic_voice.types import UserMessage, AssistantMessage
+        model = UserMessage if payload.get("type") == "user_message" else AssistantMessage
+        return model.model_validate(payload)
+    except Exception:
+        return None
+
+
+def _make_client() -> HumeAIClient:
+    client = HumeAIClient(api_key="benchmark")
+    client.stream = NoOpStream()
+    client.is_connected = True
+    client._debug_message_count = 3  # steady state: past the first-message dumps
+    return client
+
+
+def _async_case(make_op):
+    """Benchmark case running `number` awaits of an operation on a private loop."""
+    def run(number: int) -> float:
+        async def body():
+            op = make_op()
+            with quiet_stdout():
+                start = time.perf_counter()
+                for _ in range(number):
+                    await op()
+                return time.perf_counter() - start
+        return asyncio.run(body())
+    return run
+
+
+def cases(quick: bool = False):
+    """Yield (name, run, params) for each benchmark case."""
+    pcm = _speech_like_signal(1.0).astype('<i2').tobytes()
+    for size in SEND_SIZES:
+        chunk = pcm[:size]
+
+        def make_send(chunk=chunk):
+            client = _make_client()
+            return lambda: client.send_audio(chunk)
+
+        yield f"hume.send_audio[{size}B]", _async_case(make_send), {"bytes": size}
+
+    async def on_transcription(text):
+        return None
+
+    for name, payload in load_fixtures().items():
+        variants = [("dict", payload)]
+        model = _as_sdk_model(payload)
+        if model is not None:
+            variants.append(("sdk", model))
+        for kind, message in variants:
+
+            def make_process(message=message):
+                client = _make_client()
+                client.on_transcription = on_transcription
+                client.set_emotion_callback(lambda emotions: None)
+                return lambda: client._process_message(message)
+
+            yield f"hume.process_message.{name}[{kind}]", _async_case(make_process), {"payload": name, "input": kind}
@@ -0,0 +1,37 @@
+"""
+Cold-start benchmarks: importing the app and loading the Hume SDK, each
+in a fresh interpreter.
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SNIPPETS = {
+    # What a new worker pays before it can serve (SDK stays unloaded)
+    "startup.import_main": "import main",
+    # What the lifespan warm-up pays, off the event loop
+    "startup.import_main_and_warm_up": "import main, hume_client; hume_client.warm_up('benchmark')",
+}
+
+
+def _subprocess_case(snippet: str):
+    def run(number: int) -> float:
+        env = {**os.environ, "HUME_API_KEY": os.environ.get("HUME_API_KEY", "benchmark")}
+        elapsed = 0.0
+        for _ in range(number):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", snippet], cwd=BACKEND_DIR, env=env,
+                           check=True, stdout=subprocess.DEVNULL)
+            elapsed += time.perf_counter() - start
+        return elapsed
+    return run
+
+
+def cases(quick: bool = False):
+    """Yield (name, run, params) for each benchmark case."""
+    for name, snippet in STARTUP_SNIPPETS.items():
+        yield name, _subprocess_case(snippet), {"snippet": snippet}
@@ -0,0 +1,83 @@
+"""
+Benchmark of the /ws ingest loop through an in-process ASGI test client.
+
+The app runs unmodified except that each pipeline's HumeAIClient connects
+to a no-op stream instead of Hume. One operation is one binary audio frame
+taken from the socket through decode, prosody analysis, upstream queueing
+and the no-op send. The upstream rate limit is lifted so the loop runs as
+fast as it can rather than at real time.
+"""
+
+import os
+import time
+import asyncio
+
+from harness import quiet_stdout
+from codec_decode import _speech_like_signal, encode_stream, frame_bytes
+from bench_hume import NoOpStream
+
+# Frames per sync point: large enough to amortize the echo round trip
+FRAMES_PER_SYNC = 50
+WS_CODECS = ("pcm16", "mulaw")
+
+
+def _offline_client_class():
+    from hume_client import HumeAIClient
+
+    class OfflineHumeClient(HumeAIClient):
+        async def connect(self):
+            self.stream = NoOpStream()
+            self.is_connected = True
+            self._chat_audio_origin = self.audio_seconds_received
+            self.receive_task = asyncio.create_task(asyncio.Event().wait())
+
+    return OfflineHumeClient
+
+
+def _prepare_app():
+    # Read lazily by the worker singletons, so set before the app first starts
+    os.environ.setdefault("HUME_API_KEY", "benchmark")
+    os.environ["UPSTREAM_RATE_HEADROOM"] = "1000"
+    os.environ["UPSTREAM_BURST_SECONDS"] = "60"
+
+    import channel_pipeline
+    channel_pipeline.HumeAIClient = _offline_client_class()
+
+    import main
+    return main.app
+
+
+def _drain_until_echo(websocket, token: str):
+    while True:
+        message = websocket.receive()
+        if message.get("text") == token:
+            return
+
+
+def cases(quick: bool = False):
+    """Yield (name, run, params) for each benchmark case."""
+    from starlette.testclient import TestClient
+
+    app = _prepare_app()
+    signal = _speech_like_signal(2.0)
+    for codec in WS_CODECS:
+        encoded = encode_stream(codec, signal)
+        step = frame_bytes(codec)
+        frames = [encoded[i:i + step] for i in range(0, len(encoded) - step + 1, step)]
+
+        def run(number: int, codec=codec, frames=frames) -> float:
+            count = len(frames)
+            with quiet_stdout(), TestClient(app) as client:
+                with client.websocket_connect(f"/ws?codec={codec}") as websocket:
+                    websocket.receive_json()  # codec ack
+                    start = time.perf_counter()
+                    for i in range(number):
+                        websocket.send_bytes(frames[i % count])
+                        if (i + 1) % FRAMES_PER_SYNC == 0:
+                            websocket.send_text(f"sync-{i}")
+                            _drain_until_echo(websocket, f"sync-{i}")
+                    websocket.send_text("sync-end")
+                    _drain_until_echo(websocket, "sync-end")
+                    return time.perf_counter() - start
+
+        yield f"ws.ingest.{codec}[frame]", run, {"codec": codec, "bytes": step, "frames_per_sync": FRAMES_PER_SYNC}
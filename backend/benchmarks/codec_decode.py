@@ -0,0 +1,122 @@
+"""
+Benchmark ingest codec decode cost per stream-second.
+
+Run from the backend directory:
+    python benchmarks/codec_decode.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_processor import create_decoder, SUPPORTED_CODECS, ULAW_TABLE, ALAW_TABLE, IMA_STEP_TABLE, IMA_INDEX_TABLE
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 1365  # 4096-sample browser buffer at 48 kHz, downsampled to 16 kHz
+
+
+def _speech_like_signal(seconds: float) -> np.ndarray:
+    """Amplitude-modulated harmonics plus noise, roughly speech shaped."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t)) ** 2
+    noise = np.random.default_rng(0).normal(0, 0.02, t.size)
+    return np.clip((voiced * envelope * 0.25 + noise) * 32767, -32768, 32767).astype(np.int16)
+
+
+def _encode_g711(samples: np.ndarray, table: np.ndarray) -> bytes:
+    # Nearest decoded value gives the matching code (good enough for a benchmark input)
+    order = np.argsort(table)
+    positions = np.clip(np.searchsorted(table[order], samples), 0, 255)
+    return order[positions].astype(np.uint8).tobytes()
+
+
+def _encode_ima_adpcm(samples: np.ndarray) -> bytes:
+    predictor, index = 0, 0
+    codes = []
+    for sample in samples.tolist():
+        step = IMA_STEP_TABLE[index]
+        diff = sample - predictor
+        code = 8 if diff < 0 else 0
+        diff = abs(diff)
+        delta = step >> 3
+        if diff >= step:
+            code |= 4
+            diff -= step
+            delta += step
+        if diff >= step >> 1:
+            code |= 2
+            diff -= step >> 1
+            delta += step >> 1
+        if diff >= step >> 2:
+            code |= 1
+            delta += step >> 2
+        predictor = predictor - delta if code & 8 else predictor + delta
+        predictor = min(max(predictor, -32768), 32767)
+        index = min(max(index + IMA_INDEX_TABLE[code], 0), 88)
+        codes.append(code)
+    if len(codes) % 2:
+        codes.append(0)
+    packed = np.array(codes, dtype=np.uint8)
+    return (packed[0::2] | (packed[1::2] << 4)).tobytes()
+
+
+def encode_stream(codec: str, samples: np.ndarray) -> bytes:
+    """Encode PCM samples with the given ingest codec."""
+    if codec == "pcm16":
+        return samples.astype('<i2').tobytes()
+    if codec == "mulaw":
+        return _encode_g711(samples, ULAW_TABLE)
+    if codec == "alaw":
+        return _encode_g711(samples, ALAW_TABLE)
+    if codec == "ima_adpcm":
+        return _encode_ima_adpcm(samples)
+    raise ValueError(codec)
+
+
+def frame_bytes(codec: str) -> int:
+    """Bytes per browser frame for a codec."""
+    bits = create_decoder(codec).bits_per_sample
+    return FRAME_SAMPLES * bits // 8
+
+
+def bench_codec(codec: str, seconds: float = 10.0, repeat: int = 5) -> dict:
+    """Decode `seconds` of audio frame by frame and report per stream-second cost."""
+    encoded = encode_stream(codec, _speech_like_signal(seconds))
+    step = frame_bytes(codec)
+    frames = [encoded[i:i + step] for i in range(0, len(encoded), step)]
+
+    best = float("inf")
+    for _ in range(repeat):
+        decoder = create_decoder(codec)
+        start = time.perf_counter()
+        for frame in frames:
+            decoder.decode_bytes(frame)
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "codec": codec,
+        "frames": len(frames),
+        "bytes_per_frame": step,
+        "kbps": round(len(encoded) * 8 / seconds / 1000, 1),
+        "decode_us_per_stream_second": round(best / seconds * 1e6, 1),
+        "decode_us_per_frame": round(best / len(frames) * 1e6, 2),
+    }
+
+
+def main():
+    print(f"{'codec':<10} {'kbps':>7} {'bytes/frame':>12} {'us/frame':>10} {'us/stream-s':>12}")
+    for codec in SUPPORTED_CODECS:
+        result = bench_codec(codec)
+        print(f"{result['codec']:<10} {result['kbps']:>7} {result['bytes_per_frame']:>12} "
+              f"{result['decode_us_per_frame']:>10} {result['decode_us_per_stream_second']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Timing, result files and baseline comparison for the benchmark runner.
+
+A benchmark case is a callable `run(number) -> seconds` that performs the
+measured operation `number` times and returns the elapsed wall time. The
+harness calibrates `number` so one run lasts at least `min_time`, repeats
+the run and reports per-operation times in microseconds.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Optional, List
+
+RESULTS_SCHEMA = 1
+
+
+def measure(run: Callable[[int], float], min_time: float = 0.1, repeat: int = 5, max_number: int = 1_000_000) -> Dict[str, Any]:
+    """
+    Time a benchmark case.
+
+    Args:
+        run: Performs the operation `number` times and returns elapsed seconds
+        min_time: Minimum duration of one timed run (seconds)
+        repeat: Number of timed runs after calibration
+        max_number: Upper bound on operations per run
+
+    Returns:
+        Per-operation median/min/max in microseconds and the run shape
+    """
+    run(1)  # discard: first calls pay one-time costs (lazy imports, caches)
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time or number >= max_number:
+            break
+        # Aim a little past min_time so calibration converges in a few steps
+        scale = min_time * 1.2 / elapsed if elapsed > 0 else 10.0
+        number = min(max_number, max(number + 1, int(number * min(scale, 10.0))))
+
+    per_op = sorted(run(number) / number * 1e6 for _ in range(repeat))
+    return {
+        "us_per_op": round(statistics.median(per_op), 3),
+        "min_us": round(per_op[0], 3),
+        "max_us": round(per_op[-1], 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+class quiet_stdout:
+    """Send prints from the code under test to /dev/null while timing."""
+
+    def __enter__(self):
+        self._saved = sys.stdout
+        self._devnull = open(os.devnull, "w")
+        sys.stdout = self._devnull
+        return self
+
+    def __exit__(self, *exc):
+        sys.stdout = self._saved
+        self._devnull.close()
+        return False
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Machine and build details recorded with every result file."""
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+    }
+
+
+def build_report(results: Dict[str, Dict[str, Any]], quick: bool) -> Dict[str, Any]:
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def write_json(path: str, data: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def append_history(path: str, report: Dict[str, Any]):
+    """Append one compact line per run so results can be tracked over time."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(report, sort_keys=True) + "\n")
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("schema") != RESULTS_SCHEMA:
+        raise ValueError(f"{path}: unsupported results schema {report.get('schema')!r}")
+    return report
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare per-case medians against a baseline report.
+
+    Args:
+        current: Report from this run
+        baseline: Earlier report
+        threshold: Allowed slowdown as a fraction (0.1 = 10% slower)
+
+    Returns:
+        One row per case present in both reports, with `change` (fractional
+        change of the median, positive = slower) and `status`
+    """
+    rows = []
+    baseline_results = baseline.get("results", {})
+    for name, result in current["results"].items():
+        base = baseline_results.get(name)
+        if not base or not base.get("us_per_op"):
+            continue
+        change = result["us_per_op"] / base["us_per_op"] - 1.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "baseline_us": base["us_per_op"],
+            "current_us": result["us_per_op"],
+            "change": round(change, 4),
+            "status": status,
+        })
+    return rows
+
+
+def perf_counter_loop(fn: Callable[[], Any]) -> Callable[[int], float]:
+    """Wrap a zero-argument synchronous operation as a benchmark case."""
+    def run(number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+    return run
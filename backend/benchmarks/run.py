@@ -0,0 +1,113 @@
+"""
+Run the backend microbenchmarks offline and compare against a baseline.
+
+Run from the backend directory:
+    python benchmarks/run.py                         # all suites
+    python benchmarks/run.py --filter hume.          # cases whose name contains "hume."
+    python benchmarks/run.py --save-baseline         # record this run as the baseline
+    python benchmarks/run.py --baseline benchmarks/results/baseline.json --threshold 0.1
+
+Every run writes benchmarks/results/latest.json and appends to
+benchmarks/results/history.jsonl. With a baseline, cases whose median is
+more than `--threshold` slower are reported and the exit status is 1.
+"""
+
+import os
+import sys
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import harness  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+SUITES = ("audio", "hume", "ws", "startup")
+
+
+def _load_suite(name: str):
+    if name == "audio":
+        import bench_audio
+        return bench_audio
+    if name == "hume":
+        import bench_hume
+        return bench_hume
+    if name == "ws":
+        import bench_ws
+        return bench_ws
+    if name == "startup":
+        import bench_startup
+        return bench_startup
+    raise ValueError(f"Unknown suite: {name}")
+
+
+def run_suites(suites, name_filter: str, quick: bool) -> dict:
+    min_time, repeat = (0.05, 3) if quick else (0.2, 7)
+    results = {}
+    for suite in suites:
+        for name, run, params in _load_suite(suite).cases(quick=quick):
+            if name_filter and name_filter not in name:
+                continue
+            result = harness.measure(run, min_time=min_time, repeat=repeat)
+            result["params"] = params
+            results[name] = result
+            print(f"{name:<52} {result['us_per_op']:>12.2f} us/op  "
+                  f"(min {result['min_us']:.2f}, max {result['max_us']:.2f}, n={result['number']})")
+    return results
+
+
+def print_comparison(rows):
+    print()
+    print(f"{'case':<52} {'baseline us':>12} {'current us':>12} {'change':>9}")
+    for row in rows:
+        marker = {"regression": "  <-- regression", "improvement": "  (faster)"}.get(row["status"], "")
+        print(f"{row['name']:<52} {row['baseline_us']:>12.2f} {row['current_us']:>12.2f} "
+              f"{row['change'] * 100:>+8.1f}%{marker}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=SUITES,
+                        help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this string")
+    parser.add_argument("--quick", action="store_true", help="Shorter runs for a smoke check")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"),
+                        help="Where to write this run's results (JSON)")
+    parser.add_argument("--baseline", default=None,
+                        help=f"Results file to compare against (default: {os.path.relpath(DEFAULT_BASELINE)} if present)")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown of a case's median before it counts as a regression (default: 0.10)")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write this run as the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.suite or SUITES, args.filter, args.quick)
+    if not results:
+        print("No benchmark cases matched")
+        return 2
+
+    report = harness.build_report(results, quick=args.quick)
+    harness.write_json(args.output, report)
+    harness.append_history(os.path.join(RESULTS_DIR, "history.jsonl"), report)
+    print(f"\nResults written to {os.path.relpath(args.output)}")
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) else None)
+    exit_code = 0
+    if baseline_path and not args.save_baseline:
+        rows = harness.compare(report, harness.load_report(baseline_path), args.threshold)
+        report["comparison"] = {"baseline": baseline_path, "threshold": args.threshold, "cases": rows}
+        harness.write_json(args.output, report)
+        print_comparison(rows)
+        regressions = [row for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold * 100:.0f}%")
+            exit_code = 1
+
+    if args.save_baseline:
+        harness.write_json(args.baseline or DEFAULT_BASELINE, report)
+        print(f"Baseline saved to {os.path.relpath(args.baseline or DEFAULT_BASELINE)}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
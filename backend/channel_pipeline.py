@@ -0,0 +1,269 @@
+"""
+Per-speaker analysis pipelines for a call.
+
+A mono call has a single "customer" pipeline. A stereo call from the
+telephony bridge is de-interleaved into one pipeline per speaker, each
+with its own prosody analyzer, upstream Hume session and upstream lane.
+Transcripts and emotions from all speakers go through a SpeakerFeed that
+merges them into one time-ordered downstream feed.
+"""
+
+import sys
+import heapq
+import asyncio
+import itertools
+from typing import Optional, Callable, Dict, Any
+
+import numpy as np
+
+from hume_client import HumeAIClient
+from audio_processor import ProsodyAnalyzer
+from upstream_scheduler import get_upstream_scheduler
+
+
+def _payload_bytes(payload: Dict[str, Any]) -> int:
+    # Shallow estimate: the dict plus its keys and values
+    return sys.getsizeof(payload) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in payload.items())
+
+
+class SpeakerFeed:
+    """
+    Time-ordered merge of events from several speakers.
+
+    Events are held for `hold_seconds` after arrival so that one speaker's
+    slower upstream does not reorder the conversation; they are then sent
+    in order of their audio time.
+    """
+
+    def __init__(self, send_json: Callable, hold_seconds: float = 0.4):
+        self.send_json = send_json
+        self.hold_seconds = hold_seconds
+        self._heap: list = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_sent_time = 0.0
+        self._pending_bytes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Approximate memory held by events waiting for their hold window."""
+        return self._pending_bytes
+
+    def start(self):
+        if self.hold_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def push(self, event_time: Optional[float], payload: Dict[str, Any]):
+        """
+        Queue an event for delivery.
+
+        Args:
+            event_time: Audio time of the event in seconds since the call
+                started, or None if unknown (ordered as "now")
+            payload: JSON message for the frontend
+        """
+        loop_time = asyncio.get_running_loop().time()
+        if event_time is None:
+            event_time = self._last_sent_time
+        payload["stream_time"] = round(event_time, 3)
+        if self.hold_seconds <= 0:
+            await self._send(payload)
+            return
+        heapq.heappush(self._heap, (event_time, next(self._sequence), loop_time, payload))
+        self._pending_bytes += _payload_bytes(payload)
+        self._wakeup.set()
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Release everything queued before the oldest event's hold expired
+            oldest_arrival = min(arrival for _, _, arrival, _ in self._heap)
+            due = oldest_arrival + self.hold_seconds - loop.time()
+            if due > 0:
+                await asyncio.sleep(due)
+            cutoff = loop.time() - self.hold_seconds
+            ready = [entry for entry in self._heap if entry[2] <= cutoff]
+            if not ready:
+                continue
+            horizon = max(entry[0] for entry in ready)
+            while self._heap and self._heap[0][0] <= horizon:
+                event_time, _, _, payload = heapq.heappop(self._heap)
+                self._pending_bytes -= _payload_bytes(payload)
+                self._last_sent_time = max(self._last_sent_time, event_time)
+                await self._send(payload)
+
+    async def _send(self, payload: Dict[str, Any]):
+        try:
+            await self.send_json(payload)
+        except Exception as e:
+            print(f"Error sending {payload.get('type')} to frontend: {e}")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._heap.clear()
+        self._pending_bytes = 0
+
+
+class ChannelPipeline:
+    """Analysis stream for one speaker of a call."""
+
+    def __init__(
+        self,
+        session_id: str,
+        speaker: str,
+        feed: SpeakerFeed,
+        send_json: Callable,
+        suggestion_scheduler=None,
+    ):
+        """
+        Args:
+            session_id: Call session id
+            speaker: Speaker label ("customer", "agent", ...)
+            feed: Shared time-ordered feed for transcripts and emotions
+            send_json: Sends a JSON message to the frontend immediately
+            suggestion_scheduler: Fed with this speaker's utterances, if given
+        """
+        self.session_id = session_id
+        self.speaker = speaker
+        self.lane_id = f"{session_id}:{speaker}"
+        self.feed = feed
+        self.send_json = send_json
+        self.suggestion_scheduler = suggestion_scheduler
+        self.prosody_analyzer = ProsodyAnalyzer()
+        self.hume_client: Optional[HumeAIClient] = None
+        self.upstream_scheduler = get_upstream_scheduler()
+        self._connection_warned = False
+
+    async def start(self):
+        """Connect this speaker's upstream Hume session and register its lane."""
+        try:
+            self.hume_client = HumeAIClient(on_transcription=self._on_transcription)
+            self.hume_client.speaker = self.speaker
+            self.hume_client.set_emotion_callback(self._on_emotion)
+            if self.suggestion_scheduler:
+                self.hume_client.set_suggestion_scheduler(self.suggestion_scheduler)
+            await self.hume_client.connect()
+            print(f"✅ Hume AI client connected ({self.speaker})")
+            print(f"✅ Stream available: {self.hume_client.stream is not None}")
+            print(f"✅ Is connected: {self.hume_client.is_connected}")
+
+            # The receive task is already started in connect() as _receive_stream_messages
+            if self.hume_client.receive_task:
+                print("✅ Message receiver task is running")
+            else:
+                print("⚠️  No receive task found, starting one...")
+                self.hume_client.receive_task = asyncio.create_task(self.hume_client.receive_messages())
+
+            await self.upstream_scheduler.register(self.lane_id, self._send_audio_upstream)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not connect to Hume AI ({self.speaker}): {e}")
+            print("Continuing without Hume AI connection...")
+
+    async def _send_audio_upstream(self, pcm_data: bytes):
+        """Called by the upstream scheduler when this lane's turn comes up."""
+        try:
+            await self.hume_client.send_audio(pcm_data)
+        except Exception as e:
+            # Error is already handled in send_audio, just mark as disconnected
+            self.hume_client.is_connected = False
+
+    async def _on_transcription(self, transcript_text: str):
+        """Queue a transcription for the frontend, tagged with speaker and audio time."""
+        await self.feed.push(self.hume_client.last_utterance_time, {
+            "type": "transcription",
+            "speaker": self.speaker,
+            "text": transcript_text,
+            "timestamp": asyncio.get_event_loop().time()
+        })
+        print(f"📤 Queued {self.speaker} transcript for frontend: {transcript_text}")
+
+    async def _on_emotion(self, emotions: dict):
+        """Queue Hume's authoritative emotions, reconciled with local prosody hints."""
+        reconciled = self.prosody_analyzer.reconcile(emotions)
+        top_emotions = sorted(emotions.items(), key=lambda item: item[1], reverse=True)[:5]
+        await self.feed.push(self.hume_client.last_utterance_time, {
+            "type": "emotion",
+            "speaker": self.speaker,
+            **reconciled,
+            "emotions": dict(top_emotions),
+            "timestamp": asyncio.get_event_loop().time()
+        })
+
+    def memory_breakdown(self) -> Dict[str, int]:
+        """Bytes currently held by each buffer this speaker owns."""
+        lane = self.upstream_scheduler.lanes.get(self.lane_id)
+        return {
+            "upstream_queue": lane.queued_bytes if lane else 0,
+            "suspend_buffer": self.hume_client.suspend_buffer_bytes if self.hume_client else 0,
+            "prosody": self.prosody_analyzer.buffer_bytes,
+        }
+
+    def memory_capacity(self) -> int:
+        """Upper bound of the bounded buffers this speaker owns."""
+        # Assumes an upstream session, so it can be checked before connecting
+        return (
+            self.prosody_analyzer.buffer_bytes
+            + self.prosody_analyzer.FRAME * 4
+            + self.upstream_scheduler.max_queued_bytes
+            + HumeAIClient.max_buffered_audio_bytes()
+        )
+
+    async def release_upstream(self):
+        """Drop this speaker's upstream lane (wakes a submit() blocked on it)."""
+        await self.upstream_scheduler.unregister(self.lane_id)
+
+    async def feed_audio(self, samples: np.ndarray) -> bool:
+        """
+        Analyse and forward one chunk of this speaker's audio.
+
+        Args:
+            samples: int16 samples for this channel (may be a strided view)
+
+        Returns:
+            False if the frontend connection is gone
+        """
+        # Local prosody pre-analysis gives instant emotion hints mid-utterance;
+        # these bypass the feed's hold window to stay within ~100 ms
+        prosody_hint = self.prosody_analyzer.update(samples)
+        if prosody_hint:
+            try:
+                await self.send_json({"type": "prosody", "speaker": self.speaker, **prosody_hint})
+            except Exception as e:
+                print(f"Error sending prosody hint: {e}")
+                return False
+
+        # Queue audio for Hume AI if connected; waits here while this
+        # lane is full, which pushes back on the client
+        if self.hume_client and self.hume_client.accepts_audio:
+            # Upstream needs contiguous PCM; this is the only copy of a strided channel
+            await self.upstream_scheduler.submit(self.lane_id, samples.astype('<i2', copy=False).tobytes())
+        elif not self._connection_warned:
+            # Connection not available - log once
+            print(f"⚠️  Hume AI not connected ({self.speaker}) - audio chunks are being received but not processed")
+            self._connection_warned = True
+        return True
+
+    async def close(self):
+        """Drop queued audio and disconnect from Hume AI."""
+        await self.upstream_scheduler.unregister(self.lane_id)
+        if self.hume_client:
+            try:
+                await self.hume_client.disconnect()
+                print(f"✅ Hume AI connection closed ({self.speaker})")
+            except Exception as e:
+                print(f"⚠️  Error disconnecting from Hume AI: {e}")
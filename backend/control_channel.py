@@ -0,0 +1,320 @@
+"""
+Typed control protocol on the /ws text channel.
+
+Clients that connect with ?control=1 get a SessionController. It pings
+the client to measure round-trip time, reads the session's upstream queue
+fill and send latency from the scheduler, and tells the client how to
+send audio:
+
+    server -> client  {"type": "ping", "id": 3, "t": 12.5}
+    client -> server  {"type": "pong", "id": 3}
+    server -> client  {"type": "control", "id": 4, "action": "chunk", "chunk_ms": 160, "reason": "..."}
+    server -> client  {"type": "control", "id": 5, "action": "pause" | "resume", "reason": "..."}
+    server -> client  {"type": "control", "id": 6, "action": "codec", "codec": "mulaw", "reason": "..."}
+    client -> server  {"type": "control_ack", "id": 6}
+
+Short chunks keep latency low on a good link; long chunks cut per-message
+overhead when the link or upstream is congested. The ingest codec only
+changes the bytes on the client link (audio is sent upstream as PCM16), so
+it steps on link measurements alone. A codec switch is only
+applied on the server when the client acknowledges it: the ack is sent on
+the same ordered socket right before the first frame in the new codec, so
+the decoder swap lines up with the stream.
+
+Text that is not a control message is left to the caller (and echoed as
+before).
+"""
+
+import json
+import time
+import asyncio
+from typing import Optional, Dict, Any, List
+
+from audio_processor import create_decoder, INTERLEAVABLE_CODECS
+from upstream_scheduler import get_upstream_scheduler
+from settings import env_float
+
+
+# Chunk durations a client may be told to use (ms)
+CHUNK_LADDER_MS = (40, 80, 160, 320)
+
+# Codecs from highest to lowest bitrate; a congested client link moves down the ladder
+CODEC_LADDER = ("pcm16", "mulaw", "ima_adpcm")
+
+# Consecutive evaluations a link condition must hold before changing codec
+CODEC_DOWNGRADE_ROUNDS = 3
+CODEC_UPGRADE_ROUNDS = 10
+
+
+class SessionController:
+    """Measures one session's link and upstream, and steers how its client sends audio."""
+
+    def __init__(self, session, send_json, interval: Optional[float] = None):
+        """
+        Args:
+            session: CallSession being controlled
+            send_json: Sends a JSON message to the client
+            interval: Seconds between pings/evaluations. If None, read from
+                CONTROL_INTERVAL_MS (default: 2000).
+        """
+        self.session = session
+        self.send_json = send_json
+        self.interval = interval if interval is not None else env_float("CONTROL_INTERVAL_MS", 2000.0) / 1000.0
+        self.rtt_good = env_float("CONTROL_RTT_GOOD_MS", 80.0) / 1000.0
+        self.rtt_bad = env_float("CONTROL_RTT_BAD_MS", 250.0) / 1000.0
+        self.latency_good = env_float("CONTROL_UPSTREAM_GOOD_MS", 50.0) / 1000.0
+        self.latency_bad = env_float("CONTROL_UPSTREAM_BAD_MS", 150.0) / 1000.0
+        self.ping_timeout = max(self.interval * 3, 5.0)
+        self.upstream_scheduler = get_upstream_scheduler()
+
+        self.chunk_ms = CHUNK_LADDER_MS[1]
+        self.paused = False
+        self.preferred_codec: Optional[str] = None
+        self.rtt_ewma: Optional[float] = None
+        self.rtt_samples = 0
+        self.lost_pings = 0
+        self._lost_pings_seen = 0
+        self.decisions = {"chunk": 0, "pause": 0, "resume": 0, "codec": 0}
+        self.last_metrics: Dict[str, Any] = {}
+        self._pings: Dict[int, float] = {}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 1
+        self._congested_rounds = 0
+        self._good_rounds = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def hello(self) -> Dict[str, Any]:
+        """Initial settings, included in the codec acknowledgement."""
+        return {
+            "chunk_ms": self.chunk_ms,
+            "chunk_ladder_ms": list(CHUNK_LADDER_MS),
+            "ping_interval_ms": round(self.interval * 1000.0),
+        }
+
+    def start(self):
+        self.preferred_codec = self.session.decoder.codec
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._ping()
+                await self.evaluate()
+            except Exception as e:
+                print(f"⚠️  Control channel error (session {self.session.session_id}): {e}")
+
+    def _new_id(self) -> int:
+        message_id = self._next_id
+        self._next_id += 1
+        return message_id
+
+    async def _ping(self):
+        now = time.monotonic()
+        for ping_id, sent_at in list(self._pings.items()):
+            if now - sent_at > self.ping_timeout:
+                del self._pings[ping_id]
+                self.lost_pings += 1
+        # Unacknowledged instructions expire, except a codec switch: the client
+        # may still apply it, and the decoder has to follow when it does
+        for message_id, pending in list(self._pending.items()):
+            if pending["instruction"]["action"] != "codec" and now - pending["sent_at"] > self.ping_timeout:
+                del self._pending[message_id]
+        ping_id = self._new_id()
+        self._pings[ping_id] = now
+        await self.send_json({"type": "ping", "id": ping_id, "t": round(now, 3)})
+
+    def handle_text(self, text: str) -> bool:
+        """
+        Handle a client text frame.
+
+        Returns:
+            True if it was a control message, False if the caller should
+            treat it as ordinary text
+        """
+        if not text.startswith("{"):
+            return False
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return False
+        if not isinstance(message, dict):
+            return False
+        kind = message.get("type")
+        if kind == "pong":
+            self._on_pong(message.get("id"))
+            return True
+        if kind == "control_ack":
+            self._on_ack(message.get("id"))
+            return True
+        return False
+
+    def _on_pong(self, ping_id):
+        sent_at = self._pings.pop(ping_id, None)
+        if sent_at is None:
+            return
+        rtt = time.monotonic() - sent_at
+        self.rtt_samples += 1
+        self.rtt_ewma = rtt if self.rtt_ewma is None else 0.8 * self.rtt_ewma + 0.2 * rtt
+
+    def _on_ack(self, message_id):
+        pending = self._pending.pop(message_id, None)
+        if pending is None:
+            return
+        instruction = pending["instruction"]
+        action = instruction["action"]
+        if action == "codec":
+            # Frames after the ack are in the new codec: restart decoding there
+            self.session.decoder = create_decoder(instruction["codec"])
+            print(f"🎚️  Session {self.session.session_id} switched ingest codec to {instruction['codec']}")
+        elif action == "chunk":
+            self.chunk_ms = instruction["chunk_ms"]
+
+    def _pending_action(self, action: str) -> bool:
+        return any(pending["instruction"]["action"] == action for pending in self._pending.values())
+
+    async def _instruct(self, action: str, reason: str, **fields):
+        message_id = self._new_id()
+        instruction = {"type": "control", "id": message_id, "action": action, "reason": reason, **fields}
+        self._pending[message_id] = {"instruction": instruction, "sent_at": time.monotonic()}
+        self.decisions[action] += 1
+        await self.send_json(instruction)
+
+    def measure(self) -> Dict[str, Any]:
+        """Current link and upstream measurements for this session."""
+        lanes = [
+            self.upstream_scheduler.lanes.get(pipeline.lane_id)
+            for pipeline in self.session.active_pipelines
+        ]
+        lanes = [lane for lane in lanes if lane is not None]
+        fill = max(
+            (lane.queued_bytes / lane.max_queued_bytes for lane in lanes if lane.max_queued_bytes),
+            default=0.0,
+        )
+        send_latency = max((lane.send_latency_ewma for lane in lanes), default=0.0)
+        oldest_ping = min(self._pings.values(), default=None)
+        # An unanswered ping older than the estimate is a lower bound on RTT
+        rtt = self.rtt_ewma
+        if oldest_ping is not None:
+            outstanding = time.monotonic() - oldest_ping
+            rtt = outstanding if rtt is None else max(rtt, outstanding)
+        return {
+            "rtt": rtt,
+            "queue_fill": fill,
+            "send_latency": send_latency,
+            "backpressured": any(not lane.space.is_set() for lane in lanes),
+        }
+
+    def _codec_ladder(self) -> List[str]:
+        if self.session.channels > 1:
+            return [codec for codec in CODEC_LADDER if codec in INTERLEAVABLE_CODECS]
+        return list(CODEC_LADDER)
+
+    async def evaluate(self):
+        """Compare measurements with thresholds and instruct the client."""
+        metrics = self.measure()
+        self.last_metrics = metrics
+        rtt = metrics["rtt"]
+        fill = metrics["queue_fill"]
+        latency = metrics["send_latency"]
+
+        # Upstream is not draining: stop the client until it catches up
+        if not self.paused and (metrics["backpressured"] or fill > 0.9):
+            self.paused = True
+            await self._instruct("pause", "upstream backlog")
+            return
+        if self.paused:
+            if fill < 0.3 and not metrics["backpressured"]:
+                self.paused = False
+                await self._instruct("resume", "upstream drained")
+            return
+
+        # Link signals come from the client socket; upstream signals from Hume.
+        # A pong waits unread while the ingest loop is blocked on upstream
+        # backpressure, so RTT only describes the link when nothing is blocked
+        new_lost_pings = self.lost_pings - self._lost_pings_seen
+        self._lost_pings_seen = self.lost_pings
+        link_measured = not metrics["backpressured"]
+        link_congested = link_measured and (
+            (rtt is not None and rtt > self.rtt_bad) or new_lost_pings > 0
+        )
+        link_good = link_measured and not link_congested and rtt is not None and rtt < self.rtt_good
+        upstream_congested = fill > 0.5 or latency > self.latency_bad
+        upstream_good = fill < 0.25 and latency < self.latency_good
+
+        # Chunk size answers both: fewer, larger messages for a slow link or upstream
+        congested = link_congested or upstream_congested
+        good = link_good and upstream_good
+        # The server decodes to PCM16 before sending upstream, so the ingest
+        # codec only changes bytes on the client link: step it on link signals only
+        self._congested_rounds = self._congested_rounds + 1 if link_congested else 0
+        self._good_rounds = self._good_rounds + 1 if link_good else 0
+        if self._pending_action("chunk") or self._pending_action("codec"):
+            return
+
+        index = CHUNK_LADDER_MS.index(self.chunk_ms) if self.chunk_ms in CHUNK_LADDER_MS else 1
+        if congested and index < len(CHUNK_LADDER_MS) - 1:
+            await self._instruct("chunk", self._describe(metrics), chunk_ms=CHUNK_LADDER_MS[index + 1])
+            return
+        if good and index > 0:
+            await self._instruct("chunk", self._describe(metrics), chunk_ms=CHUNK_LADDER_MS[index - 1])
+            return
+
+        # Already at the longest chunk and the link is still congested: cut the bitrate
+        ladder = self._codec_ladder()
+        codec = self.session.decoder.codec
+        if codec not in ladder:
+            return
+        position = ladder.index(codec)
+        if (
+            self._congested_rounds >= CODEC_DOWNGRADE_ROUNDS
+            and index == len(CHUNK_LADDER_MS) - 1
+            and position < len(ladder) - 1
+        ):
+            self._congested_rounds = 0
+            await self._instruct("codec", self._describe(metrics), codec=ladder[position + 1])
+        elif (
+            self._good_rounds >= CODEC_UPGRADE_ROUNDS
+            and self.preferred_codec in ladder
+            and position > ladder.index(self.preferred_codec)
+        ):
+            self._good_rounds = 0
+            await self._instruct("codec", self._describe(metrics), codec=ladder[position - 1])
+
+    @staticmethod
+    def _describe(metrics: Dict[str, Any]) -> str:
+        rtt = metrics["rtt"]
+        rtt_text = f"{rtt * 1000:.0f}ms" if rtt is not None else "n/a"
+        return (f"rtt {rtt_text}, queue {metrics['queue_fill'] * 100:.0f}%, "
+                f"upstream {metrics['send_latency'] * 1000:.0f}ms")
+
+    @property
+    def state_bytes(self) -> int:
+        # Outstanding pings and instructions are the only growing state
+        return 64 * (len(self._pings) + len(self._pending))
+
+    def snapshot(self) -> Dict[str, Any]:
+        metrics = self.last_metrics
+        return {
+            "chunk_ms": self.chunk_ms,
+            "paused": self.paused,
+            "codec": self.session.decoder.codec if self.session.decoder else None,
+            "preferred_codec": self.preferred_codec,
+            "rtt_ms": round(self.rtt_ewma * 1000.0, 1) if self.rtt_ewma is not None else None,
+            "rtt_samples": self.rtt_samples,
+            "lost_pings": self.lost_pings,
+            "queue_fill": round(metrics.get("queue_fill", 0.0), 3),
+            "upstream_latency_ms": round(metrics.get("send_latency", 0.0) * 1000.0, 1),
+            "pending": [pending["instruction"]["action"] for pending in self._pending.values()],
+            "decisions": dict(self.decisions),
+        }
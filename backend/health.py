@@ -0,0 +1,264 @@
+"""
+Upstream health and worker readiness.
+
+Probing Hume means opening a real EVI chat, which takes seconds and holds
+one of the account's few concurrent chat slots. UpstreamHealth therefore
+answers from passive signals first (live sessions record every successful
+send, receive and connect), falls back to a cached probe result, and only
+probes when both are stale - one probe at a time, however many callers
+are waiting.
+
+worker_readiness() reports what a load balancer needs to route new calls:
+free chat slots, upstream queue depth and event-loop lag.
+"""
+
+import time
+import asyncio
+from typing import Optional, Dict, Any, List
+
+from loop_monitor import get_monitor
+from upstream_scheduler import get_upstream_scheduler
+from session import get_session_registry
+from startup import startup_report
+from settings import env_float, env_int
+
+
+class UpstreamHealth:
+    """Cached view of whether Hume EVI is reachable from this worker."""
+
+    def __init__(
+        self,
+        passive_window: Optional[float] = None,
+        probe_ttl: Optional[float] = None,
+        failure_ttl: Optional[float] = None,
+        probe_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            passive_window: A live session's send/receive within this many
+                seconds counts as proof of health. If None, read from
+                HUME_PASSIVE_HEALTH_SECONDS (default: 30).
+            probe_ttl: Seconds a successful probe result is reused. If None,
+                read from HUME_PROBE_TTL_SECONDS (default: 60).
+            failure_ttl: Seconds a failed probe result is reused. If None,
+                read from HUME_PROBE_FAILURE_TTL_SECONDS (default: 15).
+            probe_timeout: Seconds before a probe is abandoned. If None, read
+                from HUME_PROBE_TIMEOUT_SECONDS (default: 10).
+        """
+        self.passive_window = (
+            passive_window if passive_window is not None else env_float("HUME_PASSIVE_HEALTH_SECONDS", 30.0)
+        )
+        self.probe_ttl = probe_ttl if probe_ttl is not None else env_float("HUME_PROBE_TTL_SECONDS", 60.0)
+        self.failure_ttl = failure_ttl if failure_ttl is not None else env_float("HUME_PROBE_FAILURE_TTL_SECONDS", 15.0)
+        self.probe_timeout = (
+            probe_timeout if probe_timeout is not None else env_float("HUME_PROBE_TIMEOUT_SECONDS", 10.0)
+        )
+        self.last_success: Dict[str, float] = {}
+        self.last_failure: Optional[float] = None
+        self.last_failure_reason: Optional[str] = None
+        self.probing = 0
+        self.counters = {"passive": 0, "cached": 0, "shared": 0, "probes": 0, "probe_failures": 0}
+        self._probe_result: Optional[Dict[str, Any]] = None
+        self._probe_expires = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+
+    # Passive signals, recorded by HumeAIClient on its hot paths
+    def record_success(self, kind: str):
+        """Record a successful upstream operation ("send", "recv" or "connect")."""
+        self.last_success[kind] = time.monotonic()
+
+    def record_failure(self, reason: str):
+        """Record an upstream failure seen by a live session."""
+        self.last_failure = time.monotonic()
+        self.last_failure_reason = reason
+
+    def _passive_result(self) -> Optional[Dict[str, Any]]:
+        if not self.last_success:
+            return None
+        kind, at = max(self.last_success.items(), key=lambda item: item[1])
+        age = time.monotonic() - at
+        if age > self.passive_window:
+            return None
+        if self.last_failure is not None and self.last_failure > at:
+            return None
+        return {
+            "status": "success",
+            "source": "passive",
+            "signal": kind,
+            "age_seconds": round(age, 1),
+        }
+
+    def _cached_result(self) -> Optional[Dict[str, Any]]:
+        if self._probe_result is None or time.monotonic() >= self._probe_expires:
+            return None
+        age = time.monotonic() - self._probe_result["_checked_at"]
+        return {**self._public(self._probe_result), "source": "cache", "age_seconds": round(age, 1)}
+
+    @staticmethod
+    def _public(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in result.items() if not key.startswith("_")}
+
+    def peek(self) -> Dict[str, Any]:
+        """Best current answer without probing (for frequently polled endpoints)."""
+        result = self._passive_result() or self._cached_result()
+        if result is not None:
+            return result
+        if self.last_failure is not None and time.monotonic() - self.last_failure <= self.passive_window:
+            return {
+                "status": "error",
+                "source": "passive",
+                "message": self.last_failure_reason,
+                "age_seconds": round(time.monotonic() - self.last_failure, 1),
+            }
+        return {"status": "unknown", "source": None}
+
+    async def check(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Upstream status, probing only when passive and cached results are stale.
+
+        Args:
+            force: Skip passive signals and the cache (still joins a probe in flight)
+        """
+        if not force:
+            result = self._passive_result()
+            if result is not None:
+                self.counters["passive"] += 1
+                return result
+            result = self._cached_result()
+            if result is not None:
+                self.counters["cached"] += 1
+                return result
+
+        # Single flight: concurrent callers share the probe already running
+        if self._inflight is not None and not self._inflight.done():
+            self.counters["shared"] += 1
+            result = await asyncio.shield(self._inflight)
+            return {**result, "source": "shared"}
+        self._inflight = asyncio.ensure_future(self._probe())
+        return await asyncio.shield(self._inflight)
+
+    async def _probe(self) -> Dict[str, Any]:
+        from hume_client import HumeAIClient
+
+        self.counters["probes"] += 1
+        self.probing += 1
+        started = time.monotonic()
+        client = None
+        try:
+            client = HumeAIClient()
+            client.idle_suspend_after = 0  # a probe never idles long enough to suspend
+            await asyncio.wait_for(client.connect(), timeout=self.probe_timeout)
+            ok = client.stream is not None
+            message = "Successfully connected to Hume AI" if ok else "Hume AI did not open a chat"
+        except asyncio.TimeoutError:
+            ok, message = False, f"Timed out after {self.probe_timeout:.0f}s connecting to Hume AI"
+        except Exception as e:
+            ok, message = False, f"Failed to connect to Hume AI: {e}"
+        finally:
+            if client is not None:
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+            self.probing -= 1
+
+        now = time.monotonic()
+        if not ok:
+            self.counters["probe_failures"] += 1
+            self.record_failure(message)
+        self._probe_result = {
+            "status": "success" if ok else "error",
+            "message": message,
+            "latency_ms": round((now - started) * 1000.0, 1),
+            "_checked_at": now,
+        }
+        self._probe_expires = now + (self.probe_ttl if ok else self.failure_ttl)
+        return {**self._public(self._probe_result), "source": "probe", "age_seconds": 0.0}
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "current": self.peek(),
+            "passive_window_seconds": self.passive_window,
+            "probe_ttl_seconds": self.probe_ttl,
+            "failure_ttl_seconds": self.failure_ttl,
+            "last_success_age_seconds": {kind: round(now - at, 1) for kind, at in self.last_success.items()},
+            "probing": self.probing,
+            "counters": dict(self.counters),
+        }
+
+
+_health: Optional[UpstreamHealth] = None
+
+
+def get_upstream_health() -> UpstreamHealth:
+    """Return the worker-wide upstream health tracker."""
+    global _health
+    if _health is None:
+        _health = UpstreamHealth()
+    return _health
+
+
+def worker_readiness() -> Dict[str, Any]:
+    """
+    Capacity report for load balancers.
+
+    A worker is ready when it has warmed up, has a free Hume chat slot, its
+    upstream queues are not backed up and its event loop is responsive. MAX_HUME_CHATS is
+    this worker's share of the account's concurrent chat limit (default: 5).
+    """
+    registry = get_session_registry()
+    scheduler = get_upstream_scheduler()
+    monitor = get_monitor()
+    health = get_upstream_health()
+
+    max_chats = env_int("MAX_HUME_CHATS", 5)
+    active_chats = sum(
+        1
+        for session in registry.sessions.values()
+        for pipeline in session.active_pipelines
+        if pipeline.hume_client and pipeline.hume_client.holds_chat_slot
+    ) + health.probing
+    free_slots = max(0, max_chats - active_chats)
+
+    lanes = list(scheduler.lanes.values())
+    queued_bytes = sum(lane.queued_bytes for lane in lanes)
+    queue_capacity = scheduler.max_queued_bytes * len(lanes)
+    queue_fill = queued_bytes / queue_capacity if queue_capacity else 0.0
+    max_queue_fill = env_float("READY_MAX_QUEUE_FILL", 0.8)
+
+    loop_lag_ms = monitor.current_lag_ms()
+    max_loop_lag_ms = env_float("READY_MAX_LOOP_LAG_MS", 200.0)
+
+    upstream = health.peek()
+
+    reasons: List[str] = []
+    if not startup_report.warm:
+        reasons.append("warming up")
+    if free_slots <= 0:
+        reasons.append("no free Hume chat slots")
+    if queue_fill > max_queue_fill:
+        reasons.append("upstream queues backed up")
+    if loop_lag_ms > max_loop_lag_ms:
+        reasons.append("event loop lagging")
+    if upstream["status"] == "error":
+        reasons.append("upstream unavailable")
+
+    return {
+        "ready": not reasons,
+        "reasons": reasons,
+        "warm": startup_report.warm,
+        "sessions": len(registry),
+        "max_chats": max_chats,
+        "active_chats": active_chats,
+        "free_slots": free_slots,
+        "queue": {
+            "lanes": len(lanes),
+            "queued_bytes": queued_bytes,
+            "queued_chunks": sum(len(lane.queue) for lane in lanes),
+            "fill": round(queue_fill, 3),
+            "backpressured_lanes": sum(1 for lane in lanes if not lane.space.is_set()),
+        },
+        "loop_lag_ms": round(loop_lag_ms, 2),
+        "upstream": upstream,
+    }
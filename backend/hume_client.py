@@ -5,14 +5,143 @@ Based on Hume AI documentation: https://dev.hume.ai/intro
 """
 
 import os
+import time
 import asyncio
-from typing import Optional, Callable
-from hume import AsyncHumeClient
-from hume.empathic_voice.types.audio_input import AudioInput
-from hume.empathic_voice.types.session_settings import SessionSettings
-from hume.empathic_voice.types.audio_configuration import AudioConfiguration
+import threading
+from collections import deque
+from datetime import date
+from types import SimpleNamespace
+from typing import Optional, Callable, Dict, Any
 import json
 import base64
+from audio_processor import chunk_level_db
+from health import get_upstream_health
+from startup import startup_report
+from settings import env_float
+
+
+# The Hume SDK (httpx, websockets and its pydantic models) takes over a
+# second to import, so it is loaded on first use or by the warm-up hook.
+# One AsyncHumeClient per API key is then shared by every call on the worker;
+# each call still opens its own EVI chat socket through it.
+_sdk: Optional[SimpleNamespace] = None
+_sdk_lock = threading.RLock()
+_shared_clients: Dict[str, Any] = {}
+
+
+def load_sdk() -> SimpleNamespace:
+    """Import the Hume SDK once (blocking; safe from any thread)."""
+    global _sdk
+    if _sdk is not None:
+        return _sdk
+    with _sdk_lock:
+        if _sdk is None:
+            started = time.perf_counter()
+            from hume import AsyncHumeClient
+            from hume.empathic_voice.types.audio_input import AudioInput
+            from hume.empathic_voice.types.session_settings import SessionSettings
+            from hume.empathic_voice.types.audio_configuration import AudioConfiguration
+            _sdk = SimpleNamespace(
+                AsyncHumeClient=AsyncHumeClient,
+                AudioInput=AudioInput,
+                SessionSettings=SessionSettings,
+                AudioConfiguration=AudioConfiguration,
+            )
+            startup_report.record("hume_sdk_import", time.perf_counter() - started)
+    return _sdk
+
+
+def get_shared_client(api_key: str):
+    """Return the worker's AsyncHumeClient for an API key, creating it once."""
+    client = _shared_clients.get(api_key)
+    if client is not None:
+        return client
+    with _sdk_lock:
+        client = _shared_clients.get(api_key)
+        if client is None:
+            started = time.perf_counter()
+            client = load_sdk().AsyncHumeClient(api_key=api_key)
+            _shared_clients[api_key] = client
+            startup_report.first_call("hume_client_init", time.perf_counter() - started)
+    return client
+
+
+async def get_shared_client_async(api_key: str):
+    """
+    Return the shared AsyncHumeClient without blocking the event loop: the
+    SDK import and the client's construction both run in one worker thread.
+    """
+    client = _shared_clients.get(api_key)
+    if client is not None:
+        return client
+    return await asyncio.to_thread(get_shared_client, api_key)
+
+
+def warm_up(api_key: Optional[str] = None):
+    """
+    Pre-import the SDK, build the shared client and exercise the message
+    models used on the hot path. Blocking: run it in a thread. Never opens
+    a chat (that would hold an account slot).
+    """
+    started = time.perf_counter()
+    sdk = load_sdk()
+    api_key = api_key if api_key is not None else os.getenv("HUME_API_KEY")
+    if api_key:
+        get_shared_client(api_key)
+    # First construction and serialization of each pydantic model is the slow one
+    silence = base64.b64encode(bytes(320)).decode('utf-8')
+    sdk.AudioInput(data=silence, type="audio_input").model_dump_json()
+    sdk.SessionSettings(
+        type="session_settings",
+        audio=sdk.AudioConfiguration(channels=1, encoding="linear16", sample_rate=16000),
+    ).model_dump_json()
+    startup_report.record("hume_warmup", time.perf_counter() - started)
+
+
+class SuspensionStats:
+    """Worker-wide accounting of Hume chat slots released by idle suspension."""
+    
+    def __init__(self):
+        self.suspensions = 0
+        self.resumes = 0
+        self.failed_resumes = 0
+        self.seconds_by_day: Dict[str, float] = {}
+        self.resume_latency_ewma = 0.0
+        self.active: Dict[int, float] = {}  # id(client) -> suspended_at (monotonic)
+    
+    def suspended(self, client: "HumeAIClient"):
+        self.suspensions += 1
+        self.active[id(client)] = time.monotonic()
+    
+    def ended(self, client: "HumeAIClient", resumed: bool, resume_latency: Optional[float] = None):
+        started = self.active.pop(id(client), None)
+        if started is None:
+            return
+        day = date.today().isoformat()
+        self.seconds_by_day[day] = self.seconds_by_day.get(day, 0.0) + (time.monotonic() - started)
+        if resumed:
+            self.resumes += 1
+            if resume_latency is not None:
+                self.resume_latency_ewma = (
+                    resume_latency if self.resumes == 1 else 0.8 * self.resume_latency_ewma + 0.2 * resume_latency
+                )
+    
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        in_progress = sum(now - started for started in self.active.values())
+        today = date.today().isoformat()
+        return {
+            "suspended_now": len(self.active),
+            "suspensions": self.suspensions,
+            "resumes": self.resumes,
+            "failed_resumes": self.failed_resumes,
+            "resume_latency_ms": round(self.resume_latency_ewma * 1000.0, 1),
+            "slot_seconds_saved_today": round(self.seconds_by_day.get(today, 0.0) + in_progress, 1),
+            "slot_seconds_saved_by_day": {day: round(seconds, 1) for day, seconds in sorted(self.seconds_by_day.items())},
+        }
+
+
+suspension_stats = SuspensionStats()
 
 
 class HumeAIClient:
@@ -33,18 +162,43 @@ class HumeAIClient:
             raise ValueError("Hume API key is required. Set HUME_API_KEY environment variable.")
         
         self.api_key = api_key
-        self.client: Optional[AsyncHumeClient] = None
+        self.client = None  # shared AsyncHumeClient, see get_shared_client()
         self.stream = None
         self._stream_context = None  # Store context manager for cleanup
         self.is_connected = False
         self.on_transcription: Optional[Callable] = on_transcription
         self.on_emotion: Optional[Callable] = None
+        self.suggestion_scheduler = None  # Optional SuggestionScheduler fed with user messages
         self.receive_task = None
+        self._debug_message_count = 0
+        
+        # Idle suspension: release the Hume chat slot during long silences
+        self.idle_suspend_after = env_float("HUME_IDLE_SUSPEND_SECONDS", 30.0)  # 0 disables
+        self.preroll_seconds = env_float("HUME_PREROLL_SECONDS", 2.0)
+        self.max_resume_buffer_seconds = env_float("HUME_RESUME_BUFFER_SECONDS", 10.0)
+        self.voice_threshold_db = env_float("HUME_VOICE_THRESHOLD_DB", -45.0)
+        self.is_suspended = False
+        self._suspended_at: Optional[float] = None
+        self._suspend_buffer: deque = deque()
+        self._suspend_buffer_bytes = 0
+        self._last_activity = time.monotonic()
+        self._idle_task = None
+        self._resume_task = None
+        self._resume_retry_at = 0.0
+        
+        # Audio clock: seconds of audio handed to send_audio, and where the
+        # current chat's own timeline starts on that clock
+        self.speaker: Optional[str] = None
+        self.audio_seconds_received = 0.0
+        self._chat_audio_origin = 0.0
+        self.last_utterance_time: Optional[float] = None
         
     async def connect(self):
         """Establish WebSocket connection to Hume AI EVI."""
+        connect_started = time.perf_counter()
         try:
-            self.client = AsyncHumeClient(api_key=self.api_key)
+            self.client = await get_shared_client_async(self.api_key)
+            sdk = load_sdk()  # already imported by the call above
             
             # Connect to EVI streaming API using chat.connect
             # connect() returns an async context manager, so we use async with
@@ -64,23 +218,29 @@ class HumeAIClient:
                     print("✅ Connected to Hume AI EVI using connect_with_callbacks")
                 except Exception as e2:
                     print(f"⚠️  Alternative connection also failed: {e2}")
+                    get_upstream_health().record_failure(f"connect failed: {e2}")
                     self.stream = None
                     self._stream_context = None
             
             self.is_connected = True
+            if self.stream:
+                get_upstream_health().record_success("connect")
+            # Audio buffered during a suspension is flushed first, so the new
+            # chat's timeline starts at the oldest buffered chunk
+            self._chat_audio_origin = self.audio_seconds_received - self._suspend_buffer_bytes / (16000 * 2)
             print("✅ Hume AI client initialized successfully")
             
             # Configure session settings with audio format (16kHz, mono, linear16)
             if self.stream:
                 try:
                     # Configure audio settings: 16kHz, mono, linear16 encoding
-                    audio_config = AudioConfiguration(
+                    audio_config = sdk.AudioConfiguration(
                         channels=1,
                         encoding="linear16",
                         sample_rate=16000
                     )
                     
-                    session_settings = SessionSettings(
+                    session_settings = sdk.SessionSettings(
                         type="session_settings",
                         audio=audio_config
                     )
@@ -114,6 +274,12 @@ class HumeAIClient:
                 # Also start the receive task
                 self.receive_task = asyncio.create_task(self._receive_stream_messages())
             
+            self._last_activity = time.monotonic()
+            if self.stream and self.idle_suspend_after > 0 and (not self._idle_task or self._idle_task.done()):
+                self._idle_task = asyncio.create_task(self._watch_idle())
+            
+            if self.stream:
+                startup_report.first_call("hume_connect", time.perf_counter() - connect_started)
             return True
             
         except Exception as e:
@@ -122,11 +288,46 @@ class HumeAIClient:
             import traceback
             traceback.print_exc()
             self.is_connected = False
+            get_upstream_health().record_failure(f"connect failed: {e}")
             # Don't raise - allow connection to continue without Hume for now
             return False
     
+    @staticmethod
+    def max_buffered_audio_bytes() -> int:
+        """Most audio a client may hold locally while suspended or resuming."""
+        return int(env_float("HUME_RESUME_BUFFER_SECONDS", 10.0) * 16000 * 2)
+    
+    @property
+    def holds_chat_slot(self) -> bool:
+        """True while this client has an open EVI chat counting against the account limit."""
+        return self.stream is not None and not self.is_suspended
+    
+    @property
+    def accepts_audio(self) -> bool:
+        """True while audio should still be handed to send_audio (connected or suspended)."""
+        return self.is_connected or self.is_suspended
+    
     async def disconnect(self):
         """Close connection to Hume AI."""
+        for task in (self._idle_task, self._resume_task):
+            if task and task is not asyncio.current_task():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._idle_task = None
+        self._resume_task = None
+        if self.is_suspended:
+            suspension_stats.ended(self, resumed=False)
+            self.is_suspended = False
+            self._clear_suspend_buffer()
+        
+        await self._close_stream()
+        print("Disconnected from Hume AI")
+    
+    async def _close_stream(self):
+        """Close the upstream chat (releasing its slot) without touching idle tracking."""
         if self.receive_task:
             self.receive_task.cancel()
             try:
@@ -150,31 +351,130 @@ class HumeAIClient:
         self.is_connected = False
         self.stream = None
         self._stream_context = None
-        print("Disconnected from Hume AI")
+    
+    async def _watch_idle(self):
+        """Suspend the upstream chat after `idle_suspend_after` seconds without voice or messages."""
+        try:
+            while True:
+                await asyncio.sleep(1.0)
+                if not self.is_connected or self.is_suspended or not self.stream:
+                    continue
+                idle_for = time.monotonic() - self._last_activity
+                if idle_for >= self.idle_suspend_after:
+                    await self.suspend()
+        except asyncio.CancelledError:
+            pass
+    
+    async def suspend(self):
+        """Release the Hume chat slot; audio is buffered locally until voice returns."""
+        if self.is_suspended or not self.is_connected:
+            return
+        print(f"⏸️  No voice activity for {self.idle_suspend_after:.0f}s - suspending Hume chat to free a slot")
+        self.is_suspended = True
+        self._suspended_at = time.monotonic()
+        suspension_stats.suspended(self)
+        await self._close_stream()
+    
+    async def _resume(self):
+        """Re-establish the chat and flush the buffered pre-roll before live audio."""
+        started = time.monotonic()
+        print("▶️  Voice detected - resuming Hume chat")
+        try:
+            connected = await self.connect()
+        except Exception as e:
+            print(f"⚠️  Could not resume Hume chat: {e}")
+            connected = False
+        if not connected or not self.stream:
+            await self._resume_failed()
+            return
+        
+        # Audio keeps arriving while we flush; it is appended to the same buffer.
+        # A chunk leaves the buffer only once Hume took it: a full account
+        # accepts the socket, then rejects the first send or reports
+        # too_many_active_chats, and the audio must survive for the retry.
+        while self._suspend_buffer:
+            if not await self._send_audio_now(self._suspend_buffer[0]) or not self.is_connected:
+                await self._resume_failed()
+                return
+            self._suspend_buffer_bytes -= len(self._suspend_buffer.popleft())
+        self.is_suspended = False
+        self._resume_task = None
+        suspension_stats.ended(self, resumed=True, resume_latency=time.monotonic() - started)
+        print(f"✅ Hume chat resumed in {(time.monotonic() - started) * 1000:.0f} ms")
+    
+    async def _resume_failed(self):
+        """Stay suspended with the buffered audio and retry on voice after a delay."""
+        print("⚠️  Hume chat could not be resumed - staying suspended")
+        suspension_stats.failed_resumes += 1
+        await self._close_stream()
+        self.is_suspended = True
+        self._resume_task = None
+        self._resume_retry_at = time.monotonic() + 5.0  # e.g. no free chat slot yet
+    
+    def _buffer_while_suspended(self, audio_bytes: bytes):
+        self._suspend_buffer.append(audio_bytes)
+        self._suspend_buffer_bytes += len(audio_bytes)
+        # Keep only the pre-roll while idle; allow more once a resume is under
+        # way or waiting to be retried
+        resuming = self._resume_task or time.monotonic() < self._resume_retry_at
+        seconds = self.max_resume_buffer_seconds if resuming else self.preroll_seconds
+        limit = int(seconds * 16000 * 2)
+        while self._suspend_buffer_bytes > limit and len(self._suspend_buffer) > 1:
+            self._suspend_buffer_bytes -= len(self._suspend_buffer.popleft())
+    
+    def _clear_suspend_buffer(self):
+        self._suspend_buffer.clear()
+        self._suspend_buffer_bytes = 0
+    
+    @property
+    def suspend_buffer_bytes(self) -> int:
+        """Bytes of audio held locally while suspended."""
+        return self._suspend_buffer_bytes
     
     async def send_audio(self, audio_bytes: bytes):
         """
         Send audio chunk to Hume AI EVI stream.
         
+        While suspended for inactivity, audio is buffered locally and voice
+        activity triggers a reconnect.
+        
         Args:
             audio_bytes: Audio data in bytes (PCM 16-bit format)
         """
-        if not self.is_connected or not self.stream:
+        self.audio_seconds_received += len(audio_bytes) / (16000 * 2)
+        if self.idle_suspend_after > 0 and chunk_level_db(audio_bytes) > self.voice_threshold_db:
+            self._last_activity = time.monotonic()
+            if self.is_suspended and not self._resume_task and time.monotonic() >= self._resume_retry_at:
+                self._resume_task = asyncio.create_task(self._resume())
+        
+        if self.is_suspended:
+            self._buffer_while_suspended(audio_bytes)
             return
         
+        await self._send_audio_now(audio_bytes)
+    
+    async def _send_audio_now(self, audio_bytes: bytes) -> bool:
+        """Send one chunk on the open chat; returns True if the stream took it."""
+        if not self.is_connected or not self.stream:
+            return False
+        
         try:
+            send_started = time.perf_counter()
             # Convert audio bytes to base64 string (as required by AudioInput)
             audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
             
             # Create AudioInput object with data field (base64 string) and type
-            audio_input = AudioInput(
+            audio_input = load_sdk().AudioInput(
                 data=audio_base64,
                 type="audio_input"
             )
             
             # Send audio to EVI stream using send_audio_input method
             await self.stream.send_audio_input(audio_input)
+            get_upstream_health().record_success("send")
+            startup_report.first_call("hume_send_audio", time.perf_counter() - send_started)
             print(f"📤 Sent audio chunk to Hume: {len(audio_bytes)} bytes")
+            return True
         except Exception as e:
             error_str = str(e).lower()
             
@@ -183,18 +483,20 @@ class HumeAIClient:
                 print(f"⚠️  Hume AI connection closed: Account has reached the 5 concurrent chat limit")
                 print(f"⚠️  Stopping audio transmission. Please wait 2-3 minutes for old sessions to timeout.")
                 self.is_connected = False
-                return  # Don't print full traceback for this expected error
+                get_upstream_health().record_failure("too_many_active_chats")
+                return False  # Don't print full traceback for this expected error
             
             # Check if connection was closed for any reason
             if "connectionclosed" in error_str or "connection closed" in error_str:
                 print(f"⚠️  Hume AI connection was closed. Marking as disconnected.")
                 self.is_connected = False
-                return
+                return False
             
             # For other errors, log with traceback
             print(f"❌ Error sending audio to Hume AI: {e}")
             import traceback
             traceback.print_exc()
+            return False
     
     async def _receive_stream_messages(self):
         """
@@ -211,6 +513,7 @@ class HumeAIClient:
             while self.is_connected:
                 try:
                     response = await self.stream.recv()
+                    get_upstream_health().record_success("recv")
                     print(f"📨 Received response from Hume AI stream")
                     await self._process_message(response)
                 except asyncio.CancelledError:
@@ -259,8 +562,6 @@ class HumeAIClient:
             print(f"🔍 Received message type: {msg_type}")
             
             # Print full message structure for first few messages to debug
-            if not hasattr(self, '_debug_message_count'):
-                self._debug_message_count = 0
             if self._debug_message_count < 3:
                 print(f"📋 Full message structure ({self._debug_message_count + 1}):")
                 print(json.dumps(message_dict, indent=2, default=str))
@@ -294,17 +595,27 @@ class HumeAIClient:
                     print("⚠️  Please close other active sessions or wait for them to timeout.")
                     # Mark as not connected so we don't try to send audio
                     self.is_connected = False
+                    get_upstream_health().record_failure("too_many_active_chats")
                 
                 return  # Don't process errors as transcriptions
             
             # Check for user_message type (transcriptions)
             if msg_type == "user_message":
+                self._last_activity = time.monotonic()
+                transcript = None
+                is_interim = message_dict.get("interim", False)
+                
+                # Utterance start on this client's audio clock (seconds)
+                begin_ms = (message_dict.get("time") or {}).get("begin")
+                self.last_utterance_time = (
+                    self._chat_audio_origin + begin_ms / 1000.0 if isinstance(begin_ms, (int, float)) else None
+                )
+                
                 # Extract transcription from message.content
                 if "message" in message_dict and isinstance(message_dict["message"], dict):
                     message_obj = message_dict["message"]
                     if "content" in message_obj and message_obj["content"]:
                         transcript = message_obj["content"]
-                        is_interim = message_dict.get("interim", False)
                         
                         # Only process non-interim (final) transcriptions, or process both
                         # For now, process all transcriptions
@@ -318,6 +629,9 @@ class HumeAIClient:
                     if isinstance(models, dict):
                         # Look for prosody or emotion scores
                         for model_name, model_data in models.items():
+                            # Interim messages carry no scores yet ("prosody": null)
+                            if not isinstance(model_data, dict):
+                                continue
                             if "emotions" in model_data or "scores" in model_data:
                                 emotions = model_data.get("emotions") or model_data.get("scores", {})
                                 print(f"😊 Emotions detected from {model_name}: {len(emotions) if isinstance(emotions, dict) else 0} emotion scores")
@@ -326,6 +640,12 @@ class HumeAIClient:
                                         await self.on_emotion(emotions)
                                     else:
                                         self.on_emotion(emotions)
+                                if self.suggestion_scheduler and isinstance(emotions, dict):
+                                    self.suggestion_scheduler.update_emotions(emotions)
+                
+                # Hand the utterance to the suggestion scheduler once emotions are folded in
+                if self.suggestion_scheduler and transcript:
+                    self.suggestion_scheduler.submit(transcript, is_interim=is_interim)
             
             # Check for assistant_message (for completeness, though we focus on user transcriptions)
             elif msg_type == "assistant_message":
@@ -380,3 +700,7 @@ class HumeAIClient:
     def set_emotion_callback(self, callback: Callable):
         """Set callback function for emotion events."""
         self.on_emotion = callback
+    
+    def set_suggestion_scheduler(self, scheduler):
+        """Set the SuggestionScheduler that receives user messages."""
+        self.suggestion_scheduler = scheduler
@@ -0,0 +1,245 @@
+"""
+Event-loop health monitoring.
+
+Everything in the backend (ingest, decoding, callbacks, logging) shares one
+asyncio loop. LoopMonitor samples scheduling lag continuously into a
+histogram, and a watchdog thread flags any step that holds the loop longer
+than a threshold, capturing the blocking stack and the session it ran for.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import contextvars
+import weakref
+from collections import deque
+from typing import Optional, Dict, Any, List
+
+from settings import env_float
+
+
+# Session the current coroutine is working for (set once per /ws connection)
+current_session_id: contextvars.ContextVar = contextvars.ContextVar("current_session_id", default=None)
+
+LAG_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Task -> session id, filled by the task factory so the watchdog thread can
+# attribute a stall without touching contextvars of another thread
+_task_sessions: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def bind_session(session_id: str):
+    """Tag the current task (and every task it spawns) with a session id."""
+    current_session_id.set(session_id)
+    task = asyncio.current_task()
+    if task is not None:
+        _task_sessions[task] = session_id
+
+
+class LagHistogram:
+    """Fixed-bucket histogram of loop lag samples (milliseconds)."""
+
+    def __init__(self, buckets=LAG_BUCKETS_MS, window: int = 1200):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, lag_ms: float):
+        for i, bound in enumerate(self.buckets):
+            if lag_ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+        self._recent.append(lag_ms)
+
+    def latest(self) -> float:
+        """Most recent sample, or 0 if nothing was recorded yet."""
+        return self._recent[-1] if self._recent else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Percentile over the recent window."""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        k = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[k]
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in self.buckets] + [f">{self.buckets[-1]}ms"]
+        return {
+            "samples": self.total,
+            "max_ms": round(self.max_ms, 2),
+            "recent_p50_ms": round(self.percentile(50), 2),
+            "recent_p99_ms": round(self.percentile(99), 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class LoopMonitor:
+    """Samples event-loop lag and detects slow coroutine steps."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        slow_threshold: Optional[float] = None,
+        max_events: int = 50,
+    ):
+        """
+        Args:
+            interval: Seconds between lag samples. If None, read from
+                LOOP_MONITOR_INTERVAL_MS (default: 50 ms).
+            slow_threshold: A step holding the loop longer than this (seconds)
+                is flagged. If None, read from LOOP_SLOW_CALLBACK_MS (default: 100 ms).
+            max_events: Number of slow-step events kept for diagnostics.
+        """
+        self.interval = interval if interval is not None else env_float("LOOP_MONITOR_INTERVAL_MS", 50.0) / 1000.0
+        self.slow_threshold = (
+            slow_threshold if slow_threshold is not None else env_float("LOOP_SLOW_CALLBACK_MS", 100.0) / 1000.0
+        )
+        self.histogram = LagHistogram()
+        self.slow_events: deque = deque(maxlen=max_events)
+        self.slow_event_count = 0
+        self.started_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._previous_task_factory = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._sampler_task is not None and not self._sampler_task.done()
+
+    def current_lag_ms(self) -> float:
+        """Most recent lag estimate, including a stall that is still in progress."""
+        recent = self.histogram.latest()
+        if not self.is_running:
+            return recent
+        stalled = (time.monotonic() - self._heartbeat - self.interval) * 1000.0
+        return max(recent, stalled, 0.0)
+
+    async def start(self):
+        """Start sampling on the running loop and launch the watchdog thread."""
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.started_at = time.time()
+        self._install_task_factory()
+        self._stop.clear()
+        self._sampler_task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"🩺 Loop monitor started (interval {self.interval * 1000:.0f} ms, "
+              f"slow step threshold {self.slow_threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        """Stop sampling and the watchdog thread."""
+        self._stop.set()
+        if self._sampler_task:
+            self._sampler_task.cancel()
+            try:
+                await self._sampler_task
+            except asyncio.CancelledError:
+                pass
+            self._sampler_task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_task_factory)
+        self._loop = None
+
+    def _install_task_factory(self):
+        # Propagate the session tag to tasks spawned on behalf of a session
+        previous = self._loop.get_task_factory()
+        self._previous_task_factory = previous
+
+        def factory(loop, coro, **kwargs):
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            session_id = current_session_id.get()
+            if session_id is not None:
+                _task_sessions[task] = session_id
+            return task
+
+        self._loop.set_task_factory(factory)
+
+    async def _sample(self):
+        while True:
+            scheduled = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - scheduled - self.interval) * 1000.0)
+            self.histogram.record(lag_ms)
+            self._heartbeat = time.monotonic()
+
+    def _watch(self):
+        # Runs in its own thread: a stalled heartbeat means the loop is blocked
+        poll = max(self.slow_threshold / 4.0, 0.005)
+        current_event: Optional[Dict[str, Any]] = None
+        while not self._stop.wait(poll):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled > self.slow_threshold:
+                if current_event is None:
+                    current_event = self._capture_stall()
+                    self.slow_events.append(current_event)
+                    self.slow_event_count += 1
+                current_event["blocked_ms"] = round(stalled * 1000.0, 1)
+            elif current_event is not None:
+                print(f"🐢 Event loop blocked for {current_event['blocked_ms']} ms "
+                      f"(session: {current_event['session_id']}, task: {current_event['task']})")
+                current_event = None
+
+    def _capture_stall(self) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack: List[str] = traceback.format_stack(frame, limit=12) if frame is not None else []
+        task = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            pass
+        return {
+            "detected_at": time.time(),
+            "blocked_ms": 0.0,
+            "session_id": _task_sessions.get(task) if task is not None else None,
+            "task": task.get_name() if task is not None else None,
+            "stack": [line.rstrip() for line in stack],
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Loop health data for the diagnostics endpoint."""
+        return {
+            "running": self.is_running,
+            "started_at": self.started_at,
+            "interval_ms": round(self.interval * 1000.0, 1),
+            "slow_threshold_ms": round(self.slow_threshold * 1000.0, 1),
+            "current_lag_ms": round(self.current_lag_ms(), 2),
+            "lag": self.histogram.snapshot(),
+            "slow_steps": {
+                "count": self.slow_event_count,
+                "recent": list(self.slow_events),
+            },
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_monitor() -> LoopMonitor:
+    """Return the worker-wide loop monitor."""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor()
+    return _monitor
@@ -1,16 +1,67 @@
+from startup import startup_report  # first, so the startup clock includes every import
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import asyncio
-from hume_client import HumeAIClient
+import uuid
+import os
+from hume_client import suspension_stats, warm_up
+from audio_processor import create_decoder, SUPPORTED_CODECS, DEFAULT_CODEC, INTERLEAVABLE_CODECS, ChannelDemuxer
+from channel_pipeline import ChannelPipeline, SpeakerFeed
+from suggestion_scheduler import SuggestionScheduler
+from loop_monitor import get_monitor, bind_session
+from upstream_scheduler import get_upstream_scheduler
+from session import CallSession, get_session_registry
+from health import get_upstream_health, worker_readiness
+from control_channel import SessionController
+from settings import env_float, env_int
 
 # Load environment variables
 load_dotenv()
+startup_report.mark("imports")
 
-app = FastAPI(title="Emotion-Aware Customer Service Assistant")
 
-# Global Hume AI client instance (will be initialized per connection)
-hume_clients = {}
+async def warm_up_hume():
+    """Import the Hume SDK and build the shared client off the event loop."""
+    if os.getenv("HUME_WARMUP", "1").lower() in ("0", "false", "no"):
+        startup_report.set_warm()
+        return
+    try:
+        await asyncio.to_thread(warm_up)
+        startup_report.set_warm()
+        print(f"🔥 Hume SDK warmed up in {startup_report.phases['hume_warmup'] * 1000:.0f} ms")
+    except Exception as e:
+        print(f"⚠️  Hume warm-up failed: {e}")
+        startup_report.set_warm(error=str(e))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start worker-level instruments for the lifetime of the app."""
+    loop_monitor = get_monitor()
+    upstream_scheduler = get_upstream_scheduler()
+    session_registry = get_session_registry()
+    # Serve immediately; /ready reports "warming up" until the SDK is loaded
+    warmup_task = asyncio.create_task(warm_up_hume())
+    await loop_monitor.start()
+    await upstream_scheduler.start()
+    await session_registry.start()
+    startup_report.mark("serving")
+    yield
+    if not warmup_task.done():
+        warmup_task.cancel()
+    await session_registry.stop()
+    await upstream_scheduler.stop()
+    await loop_monitor.stop()
+
+
+app = FastAPI(title="Emotion-Aware Customer Service Assistant", lifespan=lifespan)
+
+# Telephony bridge channel order and how many upstream sessions a stereo call uses
+DEFAULT_STEREO_SPEAKERS = ("agent", "customer")
+CHANNEL_MODES = ("both", "customer_only")
 
 # Configure CORS for React frontend
 app.add_middleware(
@@ -32,77 +83,193 @@ async def health_check():
     return {"status": "healthy", "service": "customer-service-assistant"}
 
 
+@app.get("/diagnostics/loop")
+async def loop_diagnostics():
+    """Event-loop lag histogram and recent slow steps for this worker."""
+    return get_monitor().snapshot()
+
+
+@app.get("/diagnostics/upstream")
+async def upstream_diagnostics():
+    """Per-session upstream share, queue depth and throttle events."""
+    return get_upstream_scheduler().snapshot()
+
+
+@app.get("/diagnostics/suspension")
+async def suspension_diagnostics():
+    """Hume chat slot-seconds released by idle suspension."""
+    return suspension_stats.snapshot()
+
+
+@app.get("/diagnostics/sessions")
+async def session_diagnostics():
+    """Live sessions with per-buffer memory accounting against the worker budget."""
+    return get_session_registry().snapshot()
+
+
+@app.get("/diagnostics/startup")
+async def startup_diagnostics():
+    """Import, warm-up and first-call latencies for this worker."""
+    return startup_report.snapshot()
+
+
 @app.get("/test-hume")
-async def test_hume_connection():
-    """Test endpoint to verify Hume AI connection."""
-    try:
-        hume_client = HumeAIClient()
-        await hume_client.connect()
-        await hume_client.disconnect()
-        return {
-            "status": "success",
-            "message": "Successfully connected to Hume AI"
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Failed to connect to Hume AI: {str(e)}"
-        }
+async def test_hume_connection(force: bool = False):
+    """
+    Verify the Hume AI connection.
+    
+    Answers from live sessions' recent traffic or a cached probe when it can;
+    a real probe opens an EVI chat, so at most one runs at a time. Pass
+    ?force=true to skip the cache.
+    """
+    result = await get_upstream_health().check(force=force)
+    if result["status"] == "success" and "message" not in result:
+        result["message"] = f"Hume AI traffic seen {result['age_seconds']}s ago"
+    return result
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Capacity-aware readiness: 503 when this worker should not take new calls."""
+    report = worker_readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/diagnostics/health")
+async def health_diagnostics():
+    """Passive upstream signals, probe cache and counters."""
+    return get_upstream_health().snapshot()
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    print("WebSocket client connected")
+    session = CallSession(uuid.uuid4().hex[:8], websocket)
+    bind_session(session.session_id)
+    print(f"WebSocket client connected (session {session.session_id})")
+    
+    # Channel layout: mono customer audio by default, or interleaved multi-channel
+    # audio from the telephony bridge (?channels=2&speakers=agent,customer&mode=both)
+    params = websocket.query_params
+    try:
+        session.channels = max(1, int(params.get("channels", 1)))
+    except ValueError:
+        session.channels = 1
+    speakers = [name.strip() for name in params.get("speakers", "").split(",") if name.strip()]
+    if len(speakers) != session.channels:
+        if session.channels == 1:
+            speakers = ["customer"]
+        elif session.channels == len(DEFAULT_STEREO_SPEAKERS):
+            speakers = list(DEFAULT_STEREO_SPEAKERS)
+        else:
+            speakers = [f"channel{index}" for index in range(session.channels)]
+    session.speakers = speakers
+    session.mode = params.get("mode", os.getenv("STEREO_MODE", "both"))
+    if session.mode not in CHANNEL_MODES:
+        session.mode = "both"
+    
+    # Every channel opens its own Hume chat and upstream lane, and a speaker's
+    # name keys its lane, so refuse layouts this worker cannot serve as asked
+    max_channels = env_int("MAX_INGEST_CHANNELS", 2)
+    layout_error = None
+    if session.channels > max_channels:
+        layout_error = f"At most {max_channels} channels per call (requested {session.channels})"
+    elif len(set(speakers)) != len(speakers):
+        layout_error = f"Speaker names must be unique (got {', '.join(speakers)})"
+    elif session.mode == "customer_only" and "customer" not in speakers:
+        layout_error = f"mode=customer_only needs a speaker named customer (got {', '.join(speakers)})"
+    if layout_error:
+        print(f"⚠️  Rejecting session {session.session_id}: {layout_error}")
+        await websocket.send_json({"type": "error", "code": "invalid_layout", "message": layout_error})
+        await websocket.close(code=1008, reason="invalid channel layout")
+        return
     
-    # Initialize Hume AI client for this connection
-    hume_client = None
-    receive_task = None
+    # Negotiate the ingest codec requested by the client (?codec=...)
+    requested_codec = params.get("codec", DEFAULT_CODEC)
+    try:
+        session.decoder = create_decoder(requested_codec)
+        if session.channels > 1 and session.decoder.codec not in INTERLEAVABLE_CODECS:
+            raise ValueError(f"Codec {session.decoder.codec} cannot carry interleaved channels")
+    except ValueError as e:
+        print(f"⚠️  {e}. Falling back to {DEFAULT_CODEC}")
+        session.decoder = create_decoder(DEFAULT_CODEC)
+    session.demuxer = ChannelDemuxer(session.channels)
     
-    # Define callback to send transcriptions to frontend
-    async def send_transcription_to_frontend(transcript_text: str):
-        """Callback to send transcription to frontend via WebSocket."""
+    # Opt-in control protocol (?control=1): pings, chunk size, pause and codec switches
+    if params.get("control", "").lower() in ("1", "true", "yes"):
+        session.controller = SessionController(session, websocket.send_json)
+    
+    async def send_suggestion_to_frontend(suggestion: dict):
+        """Callback to send agent suggestions to frontend via WebSocket."""
         try:
-            transcript_message = {
-                "type": "transcription",
-                "text": transcript_text,
+            await websocket.send_json({
+                "type": "suggestion",
+                **suggestion,
                 "timestamp": asyncio.get_event_loop().time()
-            }
-            await websocket.send_json(transcript_message)
-            print(f"📤 Sent transcript to frontend: {transcript_text}")
+            })
+            print(f"💡 Sent suggestion to frontend{' (cached)' if suggestion.get('cached') else ''}")
         except Exception as e:
-            print(f"Error sending transcript to frontend: {e}")
+            print(f"Error sending suggestion to frontend: {e}")
+    
+    session.suggestion_scheduler = SuggestionScheduler(on_suggestion=send_suggestion_to_frontend)
+    
+    # One analysis pipeline per speaker; transcripts and emotions are merged into
+    # one time-ordered feed (no hold needed with a single speaker)
+    hold_seconds = env_float("SPEAKER_FEED_HOLD_SECONDS", 0.4) if session.channels > 1 else 0.0
+    session.feed = SpeakerFeed(websocket.send_json, hold_seconds=hold_seconds)
+    for speaker in session.speakers:
+        if session.mode == "customer_only" and speaker != "customer":
+            session.pipelines.append(None)
+            continue
+        session.pipelines.append(ChannelPipeline(
+            session.session_id,
+            speaker,
+            session.feed,
+            websocket.send_json,
+            suggestion_scheduler=session.suggestion_scheduler if speaker == "customer" else None,
+        ))
+    
+    # Refuse the call if its worst-case buffers would not fit in this worker's budget
+    registry = get_session_registry()
+    if not registry.can_admit(session):
+        print(f"⚠️  Rejecting session {session.session_id}: worker memory budget reached")
+        await websocket.send_json({"type": "error", "code": "over_capacity", "message": "Server at capacity, try again later"})
+        await websocket.close(code=1013, reason="over capacity")
+        return
+    registry.register(session)
+    
+    await websocket.send_json({
+        "type": "codec",
+        "codec": session.decoder.codec,
+        "requested": requested_codec,
+        "supported": list(SUPPORTED_CODECS),
+        "sample_rate": 16000,
+        "channels": session.channels,
+        "speakers": session.speakers,
+        "mode": session.mode,
+        "control": session.controller.hello() if session.controller else None,
+    })
+    print(f"🎚️  Ingest codec: {session.decoder.codec}, {session.channels} channel(s): "
+          f"{', '.join(session.speakers)} ({session.mode})")
     
     try:
-        # Connect to Hume AI
-        try:
-            hume_client = HumeAIClient(on_transcription=send_transcription_to_frontend)
-            await hume_client.connect()
-            print("✅ Hume AI client connected")
-            print(f"✅ Stream available: {hume_client.stream is not None}")
-            print(f"✅ Is connected: {hume_client.is_connected}")
-            
-            # The receive task is already started in connect() as _receive_stream_messages
-            # Get the task that was created
-            receive_task = hume_client.receive_task
-            if receive_task:
-                print("✅ Message receiver task is running")
-            else:
-                print("⚠️  No receive task found, starting one...")
-                receive_task = asyncio.create_task(hume_client.receive_messages())
-            
-        except Exception as e:
-            print(f"⚠️ Warning: Could not connect to Hume AI: {e}")
-            print("Continuing without Hume AI connection...")
+        # Connect every speaker's upstream Hume session concurrently
+        session.feed.start()
+        if session.controller:
+            session.controller.start()
+        await asyncio.gather(*(pipeline.start() for pipeline in session.active_pipelines))
         
-        while True:
+        while not session.closing_reason:
             try:
                 # Receive message from client (can be text or bytes)
                 message = await websocket.receive()
                 
                 if "text" in message:
+                    session.touch()
                     # Handle text messages
                     data = message["text"]
+                    if session.controller and session.controller.handle_text(data):
+                        continue
                     print(f"Received text message: {data}")
                     # Echo the message back to the client
                     try:
@@ -116,27 +283,26 @@ async def websocket_endpoint(websocket: WebSocket):
                     # Handle binary audio data
                     audio_data = message["bytes"]
                     audio_size = len(audio_data)
+                    session.touch(audio_size)
                     
                     # Only log occasionally to avoid spam (every 50 chunks)
-                    if not hasattr(websocket, '_audio_chunk_count'):
-                        websocket._audio_chunk_count = 0
-                    websocket._audio_chunk_count += 1
-                    if websocket._audio_chunk_count % 50 == 0:
-                        print(f"Received audio chunk #{websocket._audio_chunk_count}: {audio_size} bytes")
+                    if session.audio_chunk_count % 50 == 0:
+                        print(f"Received audio chunk #{session.audio_chunk_count}: {audio_size} bytes")
                     
-                    # Forward audio to Hume AI if connected
-                    if hume_client and hume_client.is_connected:
-                        try:
-                            await hume_client.send_audio(audio_data)
-                        except Exception as e:
-                            # Error is already handled in send_audio, just mark as disconnected
-                            if hume_client:
-                                hume_client.is_connected = False
-                    else:
-                        # Connection not available - log once
-                        if not hasattr(websocket, '_connection_warned'):
-                            print("⚠️  Hume AI not connected - audio chunks are being received but not processed")
-                            websocket._connection_warned = True
+                    # Decode every frame back to PCM 16-bit so stateful codecs stay in sync,
+                    # then split interleaved channels into per-speaker views (no copy)
+                    samples = session.decoder.decode(audio_data)
+                    connection_open = True
+                    for pipeline, channel_samples in zip(session.pipelines, session.demuxer.split(samples)):
+                        if pipeline and not await pipeline.feed_audio(channel_samples):
+                            connection_open = False
+                            break
+                    if not connection_open:
+                        break  # Connection likely closed
+                
+                elif message.get("type") == "websocket.disconnect":
+                    print("WebSocket client disconnected")
+                    break
                             
             except WebSocketDisconnect:
                 print("WebSocket client disconnected")
@@ -152,19 +318,14 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         print("WebSocket client disconnected (outer handler)")
     finally:
-        # Cleanup: disconnect from Hume AI
-        print("🧹 Cleaning up Hume AI connection...")
-        if receive_task:
-            receive_task.cancel()
-            try:
-                await receive_task
-            except asyncio.CancelledError:
-                pass
+        # Cleanup: drop outstanding suggestion work and queued events, then
+        # disconnect every speaker from Hume AI
+        registry.unregister(session.session_id)
+        if session.controller:
+            await session.controller.close()
+        await session.suggestion_scheduler.close()
+        await session.feed.close()
         
-        if hume_client:
-            try:
-                await hume_client.disconnect()
-                print("✅ Hume AI connection closed")
-            except Exception as e:
-                print(f"⚠️  Error disconnecting from Hume AI: {e}")
-
+        print("🧹 Cleaning up Hume AI connection...")
+        for pipeline in session.active_pipelines:
+            await pipeline.close()
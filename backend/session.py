@@ -0,0 +1,254 @@
+"""
+Call session state and the process-wide session table.
+
+Everything a /ws connection owns lives on one CallSession. Sessions are
+registered in a SessionRegistry that accounts memory per owned buffer,
+enforces a per-worker memory budget and evicts idle or zombie sessions.
+"""
+
+import sys
+import time
+import asyncio
+from typing import Optional, Dict, Any, List
+
+from starlette.websockets import WebSocketState
+from settings import env_float
+
+
+class CallSession:
+    """State for one call (one /ws connection)."""
+
+    __slots__ = (
+        "session_id",
+        "websocket",
+        "created_at",
+        "last_activity",
+        "audio_chunk_count",
+        "bytes_received",
+        "channels",
+        "speakers",
+        "mode",
+        "decoder",
+        "demuxer",
+        "pipelines",
+        "feed",
+        "suggestion_scheduler",
+        "controller",
+        "closing_reason",
+    )
+
+    def __init__(self, session_id: str, websocket):
+        self.session_id = session_id
+        self.websocket = websocket
+        self.created_at = time.monotonic()
+        self.last_activity = self.created_at
+        self.audio_chunk_count = 0
+        self.bytes_received = 0
+        self.channels = 1
+        self.speakers: List[str] = []
+        self.mode = "both"
+        self.decoder = None
+        self.demuxer = None
+        self.pipelines: list = []
+        self.feed = None
+        self.suggestion_scheduler = None
+        self.controller = None
+        self.closing_reason: Optional[str] = None
+
+    def touch(self, size: int = 0):
+        """Record client activity (any received message)."""
+        self.last_activity = time.monotonic()
+        if size:
+            self.audio_chunk_count += 1
+            self.bytes_received += size
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_activity
+
+    @property
+    def is_zombie(self) -> bool:
+        """True once the client socket is gone but the session is still registered."""
+        return (
+            self.websocket.client_state == WebSocketState.DISCONNECTED
+            or self.websocket.application_state == WebSocketState.DISCONNECTED
+        )
+
+    @property
+    def active_pipelines(self) -> list:
+        return [pipeline for pipeline in self.pipelines if pipeline]
+
+    def memory_breakdown(self) -> Dict[str, int]:
+        """Bytes currently held by each buffer the session owns."""
+        breakdown = {
+            "session": sys.getsizeof(self),
+            "decoder": self.decoder.buffer_bytes if self.decoder else 0,
+            "demuxer": self.demuxer.buffer_bytes if self.demuxer else 0,
+            "feed": self.feed.buffer_bytes if self.feed else 0,
+            "suggestions": self.suggestion_scheduler.state_bytes if self.suggestion_scheduler else 0,
+            "control": self.controller.state_bytes if self.controller else 0,
+        }
+        for pipeline in self.active_pipelines:
+            for name, size in pipeline.memory_breakdown().items():
+                breakdown[f"{pipeline.speaker}.{name}"] = size
+        return breakdown
+
+    def memory_bytes(self) -> int:
+        return sum(self.memory_breakdown().values())
+
+    def memory_capacity(self) -> int:
+        """Upper bound of the session's bounded buffers; used for admission."""
+        return sys.getsizeof(self) + sum(pipeline.memory_capacity() for pipeline in self.active_pipelines)
+
+    async def evict(self, reason: str):
+        """
+        Ask the session to end: close the client socket and release upstream
+        lanes so a submit() blocked on backpressure returns. The /ws handler
+        then exits its loop and runs its normal cleanup.
+        """
+        if self.closing_reason:
+            return
+        self.closing_reason = reason
+        print(f"🧹 Evicting session {self.session_id}: {reason}")
+        for pipeline in self.active_pipelines:
+            await pipeline.release_upstream()
+        if self.websocket.application_state != WebSocketState.DISCONNECTED:
+            try:
+                await asyncio.wait_for(self.websocket.close(code=1013, reason=reason), timeout=1.0)
+            except Exception:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        breakdown = self.memory_breakdown()
+        return {
+            "speakers": self.speakers,
+            "mode": self.mode,
+            "codec": self.decoder.codec if self.decoder else None,
+            "age_seconds": round(time.monotonic() - self.created_at, 1),
+            "idle_seconds": round(self.idle_seconds, 1),
+            "audio_chunks": self.audio_chunk_count,
+            "bytes_received": self.bytes_received,
+            "memory_bytes": sum(breakdown.values()),
+            "memory_capacity_bytes": self.memory_capacity(),
+            "memory": breakdown,
+            "control": self.controller.snapshot() if self.controller else None,
+            "closing": self.closing_reason,
+        }
+
+
+class SessionRegistry:
+    """Process-wide table of live call sessions."""
+
+    def __init__(
+        self,
+        memory_budget_mb: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            memory_budget_mb: Per-worker memory budget for session buffers. If
+                None, read from WORKER_MEMORY_BUDGET_MB (default: 256).
+            idle_timeout: Seconds without any client message before a session
+                is evicted. If None, read from SESSION_IDLE_TIMEOUT (default: 300).
+            sweep_interval: Seconds between sweeps. If None, read from
+                SESSION_SWEEP_INTERVAL (default: 10).
+        """
+        budget_mb = memory_budget_mb if memory_budget_mb is not None else env_float("WORKER_MEMORY_BUDGET_MB", 256.0)
+        self.memory_budget = int(budget_mb * 1024 * 1024)
+        self.idle_timeout = idle_timeout if idle_timeout is not None else env_float("SESSION_IDLE_TIMEOUT", 300.0)
+        self.sweep_interval = sweep_interval if sweep_interval is not None else env_float("SESSION_SWEEP_INTERVAL", 10.0)
+        self.sessions: Dict[str, CallSession] = {}
+        self.evictions = {"idle": 0, "zombie": 0, "memory": 0}
+        self.rejected = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def register(self, session: CallSession):
+        self.sessions[session.session_id] = session
+
+    def unregister(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def memory_bytes(self) -> int:
+        return sum(session.memory_bytes() for session in self.sessions.values())
+
+    def reserved_bytes(self) -> int:
+        return sum(session.memory_capacity() for session in self.sessions.values())
+
+    def can_admit(self, session: CallSession) -> bool:
+        """True if the session's worst-case buffers fit in the remaining budget."""
+        if self.reserved_bytes() + session.memory_capacity() <= self.memory_budget:
+            return True
+        self.rejected += 1
+        return False
+
+    async def start(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"❌ Session sweep failed: {e}")
+
+    async def sweep(self):
+        """Evict zombie and idle sessions, then shed the idlest until under budget."""
+        for session in list(self.sessions.values()):
+            if session.closing_reason:
+                continue
+            if session.is_zombie:
+                self.evictions["zombie"] += 1
+                await session.evict("zombie")
+            elif self.idle_timeout > 0 and session.idle_seconds > self.idle_timeout:
+                self.evictions["idle"] += 1
+                await session.evict("idle")
+
+        used = self.memory_bytes()
+        if used <= self.memory_budget:
+            return
+        for session in sorted(self.sessions.values(), key=lambda s: s.last_activity):
+            if used <= self.memory_budget:
+                break
+            if session.closing_reason:
+                continue
+            used -= session.memory_bytes()
+            self.evictions["memory"] += 1
+            await session.evict("memory budget exceeded")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "memory_budget_bytes": self.memory_budget,
+            "memory_bytes": self.memory_bytes(),
+            "reserved_bytes": self.reserved_bytes(),
+            "idle_timeout_seconds": self.idle_timeout,
+            "evictions": dict(self.evictions),
+            "rejected": self.rejected,
+            "by_session": {session_id: session.snapshot() for session_id, session in self.sessions.items()},
+        }
+
+
+_registry: Optional[SessionRegistry] = None
+
+
+def get_session_registry() -> SessionRegistry:
+    """Return the process-wide session table."""
+    global _registry
+    if _registry is None:
+        _registry = SessionRegistry()
+    return _registry
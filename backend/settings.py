@@ -0,0 +1,23 @@
+"""
+Numeric settings read from the environment.
+
+Modules read their settings lazily (when a singleton or object is built),
+so values from .env and test overrides apply. A missing or malformed value
+falls back to the default.
+"""
+
+import os
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
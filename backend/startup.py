@@ -0,0 +1,58 @@
+"""
+Startup latency report.
+
+Import this module first so its clock starts as close to process start as
+possible. Phases (imports, warm-up) and the latency of the first call on
+each hot path are recorded once and served by /diagnostics/startup.
+"""
+
+import time
+from typing import Optional, Dict, Any
+
+_started = time.monotonic()
+
+
+class StartupReport:
+    """Worker cold-start timings."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self.first_calls: Dict[str, float] = {}
+        self.warm = False
+        self.warmup_error: Optional[str] = None
+
+    def record(self, name: str, seconds: float):
+        """Record how long a phase took."""
+        self.phases[name] = seconds
+
+    def mark(self, name: str):
+        """Record a milestone as seconds since this module was imported."""
+        self.marks.setdefault(name, time.monotonic() - _started)
+
+    def first_call(self, name: str, seconds: float):
+        """Record the latency of the first call on a path (later calls are ignored)."""
+        self.first_calls.setdefault(name, seconds)
+
+    def set_warm(self, error: Optional[str] = None):
+        self.warm = True
+        self.warmup_error = error
+        self.mark("warm")
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(values: Dict[str, float]) -> Dict[str, float]:
+            return {name: round(seconds * 1000.0, 1) for name, seconds in values.items()}
+
+        return {
+            "started_at": self.started_at,
+            "uptime_seconds": round(time.monotonic() - _started, 1),
+            "warm": self.warm,
+            "warmup_error": self.warmup_error,
+            "milestones_ms": ms(self.marks),
+            "phases_ms": ms(self.phases),
+            "first_call_ms": ms(self.first_calls),
+        }
+
+
+startup_report = StartupReport()
@@ -0,0 +1,330 @@
+"""
+Suggestion request scheduling between transcription and the LLM/RAG backend.
+
+Each call gets its own SuggestionScheduler. It only fires on finalized or
+stable utterances, cancels in-flight work that a newer utterance makes
+obsolete, caps concurrency across all calls in the worker and dedupes
+requests through a normalized-text cache.
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Callable, Dict, Any
+
+from settings import env_float, env_int
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_RE = re.compile(r"[^\w\s']")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize an utterance for cache lookups (case, punctuation, spacing)."""
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def dominant_emotion(emotions: Optional[Dict[str, float]]) -> Optional[str]:
+    """Return the highest scoring emotion name, or None if there are no scores."""
+    if not emotions or not isinstance(emotions, dict):
+        return None
+    scored = [(score, name) for name, score in emotions.items() if isinstance(score, (int, float))]
+    if not scored:
+        return None
+    return max(scored)[1]
+
+
+class SuggestionBackend(ABC):
+    """Interface for whatever produces suggestions (LLM, RAG pipeline, stub)."""
+
+    name: str
+
+    @abstractmethod
+    async def generate(self, request: Dict[str, Any]) -> str:
+        """
+        Generate a suggestion for a single utterance.
+
+        Args:
+            request: Dict with "text", "emotions" and "dominant_emotion" keys
+
+        Returns:
+            Suggestion text for the agent
+        """
+
+
+class LocalStubBackend(SuggestionBackend):
+    """Local stand-in for the LLM backend with configurable latency."""
+
+    name = "stub"
+
+    def __init__(self, latency_ms: Optional[float] = None):
+        """
+        Args:
+            latency_ms: Simulated response latency. If None, read from
+                SUGGESTION_STUB_LATENCY_MS (default: 300).
+        """
+        if latency_ms is None:
+            latency_ms = env_float("SUGGESTION_STUB_LATENCY_MS", 300.0)
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    async def generate(self, request: Dict[str, Any]) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency_ms / 1000.0)
+        emotion = request.get("dominant_emotion")
+        if emotion:
+            return f"Customer tone: {emotion.lower()}. Acknowledge it before answering: \"{request['text']}\""
+        return f"Respond to: \"{request['text']}\""
+
+
+def create_backend(name: Optional[str] = None) -> SuggestionBackend:
+    """
+    Create the suggestion backend selected by name or SUGGESTION_BACKEND.
+
+    Only the local stub exists so far; the LLM/RAG backend plugs in here.
+    """
+    name = (name or os.getenv("SUGGESTION_BACKEND", "stub")).lower()
+    if name == "stub":
+        return LocalStubBackend()
+    raise ValueError(f"Unknown suggestion backend: {name}")
+
+
+class SuggestionCache:
+    """Small LRU cache of suggestions keyed by normalized text and emotion."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, suggestion = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return suggestion
+
+    def put(self, key: tuple, suggestion: str):
+        self._entries[key] = (time.monotonic(), suggestion)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Worker-wide state shared by every session's scheduler. Created lazily so
+# settings loaded from .env after import are honoured.
+_shared_cache: Optional[SuggestionCache] = None
+_concurrency_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_shared_backend: Optional[SuggestionBackend] = None
+
+
+def get_shared_cache() -> SuggestionCache:
+    """Return the worker-wide suggestion cache."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SuggestionCache(
+            max_entries=env_int("SUGGESTION_CACHE_SIZE", 512),
+            ttl_seconds=env_float("SUGGESTION_CACHE_TTL", 600.0),
+        )
+    return _shared_cache
+
+
+def _get_concurrency_limit() -> asyncio.Semaphore:
+    # One per event loop: a semaphore binds to the first loop that waits on
+    # it, and a worker (or a test client) may run more than one loop
+    loop = asyncio.get_running_loop()
+    limit = _concurrency_limits.get(loop)
+    if limit is None:
+        limit = _concurrency_limits[loop] = asyncio.Semaphore(env_int("SUGGESTION_MAX_CONCURRENCY", 4))
+    return limit
+
+
+def get_shared_backend() -> SuggestionBackend:
+    """Return the worker-wide suggestion backend, creating it on first use."""
+    global _shared_backend
+    if _shared_backend is None:
+        _shared_backend = create_backend()
+    return _shared_backend
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the shared suggestion cache."""
+    cache = get_shared_cache()
+    return {
+        "entries": len(cache),
+        "hits": cache.hits,
+        "misses": cache.misses,
+        "max_concurrency": env_int("SUGGESTION_MAX_CONCURRENCY", 4),
+    }
+
+
+class SuggestionScheduler:
+    """Per-session scheduler for suggestion requests."""
+
+    def __init__(
+        self,
+        on_suggestion: Optional[Callable] = None,
+        backend: Optional[SuggestionBackend] = None,
+        stable_after: Optional[float] = None,
+        cache: Optional[SuggestionCache] = None,
+    ):
+        """
+        Args:
+            on_suggestion: Callback receiving a suggestion dict
+            backend: Suggestion backend. Defaults to the worker-wide backend.
+            stable_after: Seconds an interim transcript must stay unchanged
+                before it is treated as stable. If None, read from
+                SUGGESTION_STABLE_AFTER (default: 1.2).
+            cache: Suggestion cache. Defaults to the worker-wide cache.
+        """
+        self.on_suggestion = on_suggestion
+        self.backend = backend or get_shared_backend()
+        self.stable_after = stable_after if stable_after is not None else env_float("SUGGESTION_STABLE_AFTER", 1.2)
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.latest_emotions: Optional[Dict[str, float]] = None
+        self._pending_interim: Optional[asyncio.Task] = None
+        self._in_flight: Optional[asyncio.Task] = None
+        self._last_dispatched: Optional[tuple] = None
+        self.stats = {
+            "submitted": 0,
+            "dispatched": 0,
+            "cache_hits": 0,
+            "cancelled": 0,
+            "completed": 0,
+            "errors": 0,
+        }
+
+    @property
+    def state_bytes(self) -> int:
+        """Approximate memory held for the latest emotion context."""
+        if not self.latest_emotions:
+            return 0
+        return sys.getsizeof(self.latest_emotions) + sum(sys.getsizeof(name) + 24 for name in self.latest_emotions)
+
+    def update_emotions(self, emotions: Optional[Dict[str, float]]):
+        """Record emotion scores from the latest user_message."""
+        if emotions:
+            self.latest_emotions = emotions
+
+    def submit(self, text: str, is_interim: bool = False):
+        """
+        Submit an utterance. Final utterances dispatch immediately; interim
+        ones only dispatch once they stop changing for `stable_after` seconds.
+        """
+        if not text or not text.strip():
+            return
+        self.stats["submitted"] += 1
+
+        # Any newer utterance supersedes a pending interim one
+        self._cancel(self._pending_interim)
+        self._pending_interim = None
+
+        if is_interim:
+            self._pending_interim = asyncio.create_task(self._dispatch_when_stable(text))
+        else:
+            self._dispatch(text)
+
+    async def _dispatch_when_stable(self, text: str):
+        try:
+            await asyncio.sleep(self.stable_after)
+        except asyncio.CancelledError:
+            return
+        self._pending_interim = None
+        self._dispatch(text)
+
+    def _dispatch(self, text: str):
+        normalized = normalize_text(text)
+        if not normalized:
+            return
+        key = (normalized, dominant_emotion(self.latest_emotions))
+        if key == self._last_dispatched:
+            # Same utterance as the last one dispatched (e.g. interim became
+            # final), whether its suggestion is still running or already sent
+            return
+        self._last_dispatched = key
+
+        # The newer utterance makes any in-flight request obsolete
+        if self._cancel(self._in_flight):
+            self.stats["cancelled"] += 1
+        self._in_flight = None
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            self._in_flight = asyncio.create_task(self._deliver(text, cached, cached=True))
+            return
+
+        self.stats["dispatched"] += 1
+        request = {
+            "text": text,
+            "emotions": self.latest_emotions,
+            "dominant_emotion": key[1],
+        }
+        self._in_flight = asyncio.create_task(self._run(key, request))
+
+    async def _run(self, key: tuple, request: Dict[str, Any]):
+        try:
+            async with _get_concurrency_limit():
+                suggestion = await self.backend.generate(request)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Suggestion backend error: {e}")
+            return
+        self.cache.put(key, suggestion)
+        self.stats["completed"] += 1
+        await self._deliver(request["text"], suggestion, cached=False)
+
+    async def _deliver(self, text: str, suggestion: str, cached: bool):
+        if not self.on_suggestion:
+            return
+        payload = {
+            "text": suggestion,
+            "utterance": text,
+            "emotion": dominant_emotion(self.latest_emotions),
+            "cached": cached,
+        }
+        try:
+            if asyncio.iscoroutinefunction(self.on_suggestion):
+                await self.on_suggestion(payload)
+            else:
+                self.on_suggestion(payload)
+        except Exception as e:
+            print(f"Error in suggestion callback: {e}")
+
+    @staticmethod
+    def _cancel(task: Optional[asyncio.Task]) -> bool:
+        if task and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    async def close(self):
+        """Cancel any pending or in-flight work for this session."""
+        for task in (self._pending_interim, self._in_flight):
+            if self._cancel(task):
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._pending_interim = None
+        self._in_flight = None
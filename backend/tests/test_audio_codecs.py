@@ -0,0 +1,130 @@
+"""
+Ingest decoders: round trips through the benchmark encoders, frame
+boundaries, PCM16 odd-byte carry, and bit-exactness against audioop.
+"""
+
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from audio_processor import AudioDecoder, create_decoder, SUPPORTED_CODECS, IMA_DELTA_TABLE, IMA_NEXT_INDEX  # noqa: E402
+from codec_decode import encode_stream, _speech_like_signal  # noqa: E402
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:  # removed in Python 3.13
+        audioop = None
+
+needs_audioop = pytest.mark.skipif(audioop is None, reason="audioop not available")
+
+
+def _uneven_split(data: bytes, seed: int = 0) -> list:
+    """Cut a byte stream into frames of 1 to 701 bytes, odd sizes included."""
+    rng = np.random.default_rng(seed)
+    frames, position = [], 0
+    while position < len(data):
+        size = int(rng.integers(1, 702))
+        frames.append(data[position:position + size])
+        position += size
+    return frames
+
+
+def _decode_frames(codec: str, frames: list) -> np.ndarray:
+    decoder = create_decoder(codec)
+    return np.concatenate([decoder.decode(frame) for frame in frames])
+
+
+def _clipping_signal() -> np.ndarray:
+    # Full-scale square wave: the ADPCM predictor overshoots and saturates
+    t = np.arange(4000)
+    return np.where((t // 40) % 2 == 0, 32767, -32768).astype(np.int16)
+
+
+@pytest.mark.parametrize("codec", SUPPORTED_CODECS)
+def test_uneven_frames_decode_like_one_frame(codec):
+    encoded = encode_stream(codec, _speech_like_signal(1.0))
+    whole = create_decoder(codec).decode(encoded)
+    assert np.array_equal(_decode_frames(codec, _uneven_split(encoded)), whole)
+
+
+def test_pcm16_round_trip_is_exact():
+    signal = _speech_like_signal(1.0)
+    decoded = _decode_frames("pcm16", _uneven_split(encode_stream("pcm16", signal)))
+    assert np.array_equal(decoded, signal)
+
+
+@pytest.mark.parametrize("codec", ["mulaw", "alaw", "ima_adpcm"])
+def test_lossy_round_trip_tracks_the_signal(codec):
+    signal = _speech_like_signal(1.0)
+    decoded = _decode_frames(codec, _uneven_split(encode_stream(codec, signal)))[:signal.size]
+    assert decoded.dtype == np.int16
+    assert decoded.size == signal.size
+    error = decoded.astype(np.float64) - signal
+    snr_db = 10 * np.log10(np.sum(signal.astype(np.float64) ** 2) / np.sum(error ** 2))
+    assert snr_db > 28.0
+
+
+def test_pcm16_carries_odd_byte_across_frames():
+    data = np.arange(-500, 500, dtype='<i2').tobytes()
+    decoder = create_decoder("pcm16")
+    first = decoder.decode(data[:7])
+    assert first.size == 3
+    assert decoder.buffer_bytes == 1
+    second = decoder.decode(data[7:])
+    assert decoder.buffer_bytes == 0
+    assert np.array_equal(np.concatenate((first, second)), np.arange(-500, 500))
+
+
+def test_pcm16_even_frame_passes_through_unchanged():
+    data = np.arange(100, dtype='<i2').tobytes()
+    decoder = create_decoder("pcm16")
+    assert decoder.decode_bytes(data) is data
+    decoder.decode(data[:1])
+    assert decoder.decode_bytes(data[1:] + b"\x00") == data
+
+
+@needs_audioop
+@pytest.mark.parametrize("codec, reference", [("mulaw", "ulaw2lin"), ("alaw", "alaw2lin")])
+def test_g711_matches_audioop_for_every_code(codec, reference):
+    codes = bytes(range(256))
+    expected = np.frombuffer(getattr(audioop, reference)(codes, 2), dtype='<i2')
+    assert np.array_equal(create_decoder(codec).decode(codes), expected)
+
+
+def _audioop_ima(data: bytes) -> np.ndarray:
+    # audioop packs the first sample in the high nibble; the ingest format
+    # (and the frontend encoder) puts it in the low nibble
+    packed = np.frombuffer(data, dtype=np.uint8)
+    swapped = ((packed << 4) | (packed >> 4)).astype(np.uint8).tobytes()
+    pcm, _ = audioop.adpcm2lin(swapped, 2, None)
+    return np.frombuffer(pcm, dtype='<i2')
+
+
+@needs_audioop
+@pytest.mark.parametrize("source", ["speech", "clipping", "random"])
+def test_ima_adpcm_matches_audioop(source):
+    if source == "random":
+        encoded = np.random.default_rng(1).integers(0, 256, 20000, dtype=np.uint8).tobytes()
+    else:
+        signal = _speech_like_signal(1.0) if source == "speech" else _clipping_signal()
+        encoded = encode_stream("ima_adpcm", signal)
+    assert np.array_equal(_decode_frames("ima_adpcm", _uneven_split(encoded, seed=2)), _audioop_ima(encoded))
+
+
+def test_ima_adpcm_decodes_low_nibble_first():
+    decoded = create_decoder("ima_adpcm").decode(bytes([0x07]))
+    first = IMA_DELTA_TABLE[0, 7]
+    assert decoded[0] == first
+    assert decoded[1] == first + IMA_DELTA_TABLE[IMA_NEXT_INDEX[7], 0]
+
+
+def test_decoder_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        AudioDecoder()
@@ -0,0 +1,62 @@
+"""
+/test-hume keeps its "success"/"error" status values whatever answers it.
+"""
+
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+import main
+import hume_client
+from health import UpstreamHealth
+
+
+class FailingClient:
+    def __init__(self):
+        self.stream = None
+
+    async def connect(self):
+        raise RuntimeError("no route to Hume")
+
+    async def disconnect(self):
+        pass
+
+
+@pytest.fixture
+def health(monkeypatch):
+    upstream_health = UpstreamHealth(passive_window=30.0, probe_ttl=60.0, failure_ttl=15.0, probe_timeout=1.0)
+    monkeypatch.setattr(main, "get_upstream_health", lambda: upstream_health)
+    monkeypatch.setenv("HUME_WARMUP", "0")
+    return upstream_health
+
+
+def test_passive_traffic_reports_success(health):
+    health.record_success("send")
+    with TestClient(main.app) as client:
+        result = client.get("/test-hume").json()
+    assert result["status"] == "success"
+    assert result["source"] == "passive"
+    assert "age_seconds" in result
+
+
+def test_failed_probe_reports_error_and_is_cached(health, monkeypatch):
+    monkeypatch.setattr(hume_client, "HumeAIClient", FailingClient)
+    with TestClient(main.app) as client:
+        probed = client.get("/test-hume").json()
+        cached = client.get("/test-hume").json()
+    assert probed["status"] == "error"
+    assert probed["source"] == "probe"
+    assert cached["status"] == "error"
+    assert cached["source"] == "cache"
+
+
+def test_successful_probe_reports_success(monkeypatch):
+    class ConnectingClient(FailingClient):
+        async def connect(self):
+            self.stream = object()
+
+    monkeypatch.setattr(hume_client, "HumeAIClient", ConnectingClient)
+    result = asyncio.run(UpstreamHealth(probe_timeout=1.0).check())
+    assert result["status"] == "success"
+    assert result["source"] == "probe"
@@ -0,0 +1,30 @@
+"""
+Shared Hume client construction stays off the event loop thread.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import hume_client
+
+
+def test_shared_client_is_built_off_the_event_loop(monkeypatch):
+    built_on = []
+
+    class FakeClient:
+        def __init__(self, api_key):
+            built_on.append(threading.get_ident())
+
+    monkeypatch.setattr(hume_client, "load_sdk", lambda: SimpleNamespace(AsyncHumeClient=FakeClient))
+    monkeypatch.setattr(hume_client, "_shared_clients", {})
+
+    async def body():
+        first = await hume_client.get_shared_client_async("key")
+        second = await hume_client.get_shared_client_async("key")
+        return threading.get_ident(), first, second
+
+    loop_thread, first, second = asyncio.run(body())
+    assert first is second
+    assert len(built_on) == 1
+    assert built_on[0] != loop_thread
@@ -0,0 +1,182 @@
+"""
+Idle suspension of a Hume chat: pre-roll buffering, resume and flush order,
+and a resume the account rejects.
+"""
+
+import time
+import asyncio
+import base64
+
+import numpy as np
+import pytest
+
+import hume_client
+from hume_client import HumeAIClient, SuspensionStats
+
+CHUNK_SAMPLES = 1600  # 100 ms at 16 kHz
+
+
+def _quiet(marker: int) -> bytes:
+    # Far below the voice threshold, and tagged so flush order can be checked
+    return np.full(CHUNK_SAMPLES, marker, dtype='<i2').tobytes()
+
+
+def _voice() -> bytes:
+    t = np.arange(CHUNK_SAMPLES) / 16000.0
+    return (8000 * np.sin(2 * np.pi * 200.0 * t)).astype('<i2').tobytes()
+
+
+class FakeStream:
+    """EVI socket stand-in; `reject` makes audio sends fail like a full account."""
+
+    def __init__(self, reject: bool = False, error_message: dict = None):
+        self.reject = reject
+        self.error_message = error_message
+        self.sent = []
+        self.closed = False
+
+    async def send_audio_input(self, message):
+        await asyncio.sleep(0.01)
+        if self.reject:
+            raise RuntimeError("received 1008 (policy violation) too_many_active_chats")
+        self.sent.append(base64.b64decode(message.data))
+
+    async def recv(self):
+        if self.error_message is not None:
+            message, self.error_message = self.error_message, None
+            return message
+        await asyncio.Event().wait()
+
+
+class FakeHume:
+    """Shared AsyncHumeClient stand-in handing out the queued fake streams in order."""
+
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.empathic_voice = self
+        self.chat = self
+
+    def connect(self):
+        hume = self
+
+        class Context:
+            async def __aenter__(self):
+                self.stream = hume.streams.pop(0)
+                return self.stream
+
+            async def __aexit__(self, *exc):
+                self.stream.closed = True
+
+        return Context()
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = SuspensionStats()
+    monkeypatch.setattr(hume_client, "suspension_stats", stats)
+    return stats
+
+
+def _client(monkeypatch, *streams) -> HumeAIClient:
+    fake = FakeHume(streams)
+
+    async def shared_client(api_key):
+        return fake
+
+    monkeypatch.setattr(hume_client, "get_shared_client_async", shared_client)
+    client = HumeAIClient(api_key="test")
+    client.idle_suspend_after = 30.0
+    client.preroll_seconds = 0.5
+    return client
+
+
+async def _resume_with(client: HumeAIClient, chunk: bytes):
+    await client.send_audio(chunk)
+    assert client._resume_task is not None
+    await client._resume_task
+
+
+def test_suspend_releases_chat_and_keeps_only_preroll(monkeypatch, stats):
+    stream = FakeStream()
+    client = _client(monkeypatch, stream)
+
+    async def body():
+        await client.connect()
+        await client.suspend()
+        for marker in range(1, 21):
+            await client.send_audio(_quiet(marker))
+        buffered = list(client._suspend_buffer)
+        await client.disconnect()
+        return buffered
+
+    buffered = asyncio.run(body())
+    assert stream.closed
+    assert stream.sent == []
+    assert stats.suspensions == 1
+    # 0.5 s of pre-roll: the newest five 100 ms chunks
+    assert buffered == [_quiet(marker) for marker in range(16, 21)]
+
+
+def test_resume_flushes_preroll_before_live_audio(monkeypatch, stats):
+    first, second = FakeStream(), FakeStream()
+    client = _client(monkeypatch, first, second)
+
+    async def body():
+        await client.connect()
+        await client.suspend()
+        for marker in (1, 2, 3):
+            await client.send_audio(_quiet(marker))
+        await _resume_with(client, _voice())
+        await client.send_audio(_quiet(4))
+        state = (client.is_suspended, client.accepts_audio, client.suspend_buffer_bytes)
+        await client.disconnect()
+        return state
+
+    is_suspended, accepts_audio, buffer_bytes = asyncio.run(body())
+    assert second.sent == [_quiet(1), _quiet(2), _quiet(3), _voice(), _quiet(4)]
+    assert not is_suspended and accepts_audio
+    assert buffer_bytes == 0
+    assert stats.resumes == 1
+    assert stats.failed_resumes == 0
+
+
+@pytest.mark.parametrize("rejected", [
+    FakeStream(reject=True),
+    FakeStream(error_message={"type": "error", "code": "E0724", "slug": "too_many_active_chats",
+                              "message": "Too many active chats"}),
+], ids=["send_rejected", "error_message"])
+def test_rejected_resume_stays_suspended_and_retries(monkeypatch, stats, rejected):
+    retry = FakeStream()
+    client = _client(monkeypatch, FakeStream(), rejected, retry)
+
+    async def body():
+        await client.connect()
+        await client.suspend()
+        await client.send_audio(_quiet(1))
+        await _resume_with(client, _voice())
+        after_rejection = (
+            client.is_suspended,
+            client.accepts_audio,
+            list(client._suspend_buffer),
+            client._resume_retry_at - time.monotonic(),
+        )
+        # Voice within the retry delay is buffered without another attempt
+        await client.send_audio(_voice())
+        no_retry_yet = client._resume_task is None
+        client._resume_retry_at = 0.0
+        await _resume_with(client, _voice())
+        resumed = not client.is_suspended
+        await client.disconnect()
+        return after_rejection, no_retry_yet, resumed
+
+    (is_suspended, accepts_audio, buffered, retry_in), no_retry_yet, resumed = asyncio.run(body())
+    assert is_suspended and accepts_audio
+    assert 4.0 < retry_in <= 5.0
+    assert buffered == [_quiet(1), _voice()]
+    assert rejected.closed
+    assert no_retry_yet
+    assert stats.failed_resumes == 1
+    assert resumed
+    assert stats.resumes == 1
+    # Nothing buffered before or during the rejected attempt was lost
+    assert retry.sent == [_quiet(1), _voice(), _voice(), _voice()]
@@ -0,0 +1,80 @@
+"""
+ProsodyAnalyzer pitch, framing and reconciliation on synthetic audio.
+"""
+
+import numpy as np
+import pytest
+
+from audio_processor import ProsodyAnalyzer
+
+SAMPLE_RATE = 16000
+
+
+def _tone(hz: float, seconds: float = 1.0, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * hz * t)).astype('<i2')
+
+
+def _feed(analyzer: ProsodyAnalyzer, samples: np.ndarray, chunk: int = 1600) -> list:
+    hints = []
+    for start in range(0, samples.size, chunk):
+        hint = analyzer.update(samples[start:start + chunk])
+        if hint is not None:
+            hints.append(hint)
+    return hints
+
+
+@pytest.mark.parametrize("hz", [100.0, 120.0, 200.0, 300.0, 390.0])
+def test_pure_tone_pitch(hz):
+    hints = _feed(ProsodyAnalyzer(), _tone(hz))
+    assert hints and all(hint["speaking"] for hint in hints)
+    assert hints[-1]["pitch_hz"] == pytest.approx(hz, rel=0.01)
+
+
+def test_silence_is_not_speech():
+    analyzer = ProsodyAnalyzer()
+    hints = _feed(analyzer, np.zeros(SAMPLE_RATE, dtype='<i2'))
+    assert hints
+    for hint in hints:
+        assert not hint["speaking"]
+        assert hint["pitch_hz"] == 0.0
+        assert hint["arousal"] == 0.0
+    assert not analyzer._f0.any()
+
+
+def test_sub_frame_chunks_are_carried_over():
+    analyzer = ProsodyAnalyzer()
+    tone = _tone(200.0, seconds=0.5)
+    # 160 samples (10 ms) per call: well under one 512-sample frame
+    assert analyzer.update(tone[:160]) is None
+    assert analyzer._frames_seen == 0
+    assert analyzer._pending.size == 160
+    hints = _feed(analyzer, tone[160:], chunk=160)
+    # Same frames as feeding the audio in one piece
+    assert analyzer._frames_seen == 1 + (tone.size - ProsodyAnalyzer.FRAME) // ProsodyAnalyzer.HOP
+    assert hints[-1]["pitch_hz"] == pytest.approx(200.0, rel=0.01)
+
+
+def _offset_after(emotions: dict) -> float:
+    analyzer = ProsodyAnalyzer()
+    _feed(analyzer, _tone(200.0, amplitude=0.05))
+    provisional = analyzer._provisional_sum / analyzer._provisional_count
+    result = analyzer.reconcile(emotions)
+    assert result["provisional_arousal"] == pytest.approx(provisional, abs=1e-3)
+    assert analyzer._provisional_count == 0
+    return analyzer.calibration_offset
+
+
+def test_reconcile_raises_offset_when_hume_hears_more_arousal():
+    assert _offset_after({"Anger": 0.6, "Distress": 0.5, "Calmness": 0.0}) > 0.0
+
+
+def test_reconcile_lowers_offset_when_hume_hears_calm():
+    assert _offset_after({"Calmness": 0.8, "Contentment": 0.6, "Anger": 0.0}) < 0.0
+
+
+def test_reconcile_without_provisional_hints_keeps_offset():
+    analyzer = ProsodyAnalyzer()
+    result = analyzer.reconcile({"Anger": 0.9})
+    assert result["provisional_arousal"] is None
+    assert analyzer.calibration_offset == 0.0
@@ -0,0 +1,143 @@
+"""
+SessionRegistry admission and sweeps over CallSessions with fake sockets
+and pipelines; eviction runs against a real UpstreamScheduler lane.
+"""
+
+import time
+import asyncio
+
+from starlette.websockets import WebSocketState
+
+from session import CallSession, SessionRegistry
+from upstream_scheduler import UpstreamScheduler
+
+KB = 1024
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.client_state = WebSocketState.CONNECTED
+        self.application_state = WebSocketState.CONNECTED
+        self.closed_with = None
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = (code, reason)
+        self.application_state = WebSocketState.DISCONNECTED
+
+
+class FakePipeline:
+    """Stands in for ChannelPipeline's memory accounting and upstream lane."""
+
+    def __init__(self, speaker: str, held: int, capacity: int, scheduler: UpstreamScheduler = None):
+        self.speaker = speaker
+        self.held = held
+        self.capacity = capacity
+        self.scheduler = scheduler
+        self.released = False
+
+    def memory_breakdown(self):
+        return {"buffers": self.held}
+
+    def memory_capacity(self) -> int:
+        return self.capacity
+
+    async def release_upstream(self):
+        self.released = True
+        if self.scheduler is not None:
+            await self.scheduler.unregister(self.speaker)
+
+
+def _session(session_id: str, held: int = 0, capacity: int = 0, idle_for: float = 0.0) -> CallSession:
+    session = CallSession(session_id, FakeWebSocket())
+    session.pipelines = [FakePipeline(f"{session_id}:customer", held, capacity)]
+    session.last_activity = time.monotonic() - idle_for
+    return session
+
+
+def _registry(**kwargs) -> SessionRegistry:
+    settings = {"memory_budget_mb": 1.0, "idle_timeout": 0.0, "sweep_interval": 60.0}
+    settings.update(kwargs)
+    return SessionRegistry(**settings)
+
+
+def test_admission_rejects_session_over_budget():
+    registry = _registry(memory_budget_mb=1.0)
+    for session_id in ("a", "b"):
+        session = _session(session_id, capacity=400 * KB)
+        assert registry.can_admit(session)
+        registry.register(session)
+    assert not registry.can_admit(_session("c", capacity=400 * KB))
+    assert registry.rejected == 1
+    assert len(registry) == 2
+    # A smaller call still fits in what is left
+    assert registry.can_admit(_session("d", capacity=100 * KB))
+
+
+def test_sweep_evicts_idle_and_zombie_sessions():
+    registry = _registry(idle_timeout=10.0)
+    idle, zombie, live = _session("idle", idle_for=20.0), _session("zombie"), _session("live", idle_for=5.0)
+    zombie.websocket.client_state = WebSocketState.DISCONNECTED
+    for session in (idle, zombie, live):
+        registry.register(session)
+
+    asyncio.run(registry.sweep())
+
+    assert idle.closing_reason == "idle"
+    assert idle.websocket.closed_with == (1013, "idle")
+    assert idle.pipelines[0].released
+    assert zombie.closing_reason == "zombie"
+    assert live.closing_reason is None
+    assert registry.evictions == {"idle": 1, "zombie": 1, "memory": 0}
+
+
+def test_sweep_sheds_idlest_session_first_until_under_budget():
+    registry = _registry(memory_budget_mb=1.0)
+    sessions = [_session(name, held=400 * KB, idle_for=idle_for)
+                for name, idle_for in (("recent", 1.0), ("idlest", 30.0), ("older", 10.0))]
+    for session in sessions:
+        registry.register(session)
+
+    asyncio.run(registry.sweep())
+
+    assert [session.closing_reason for session in sessions] == [None, "memory budget exceeded", None]
+    assert registry.evictions["memory"] == 1
+
+
+def test_evicted_session_handler_leaves_its_loop():
+    async def scenario():
+        scheduler = UpstreamScheduler(rate_headroom=1.25, burst_seconds=2.0, max_queue_seconds=0.1)
+
+        async def stalled_upstream(chunk):
+            await asyncio.Event().wait()
+
+        session = _session("call", idle_for=0.0)
+        pipeline = FakePipeline("call:customer", 0, 0, scheduler)
+        session.pipelines = [pipeline]
+        await scheduler.register(pipeline.speaker, stalled_upstream)
+        registry = _registry(idle_timeout=10.0)
+        registry.register(session)
+
+        # The /ws loop shape: keep submitting until the session is closing
+        async def handler():
+            while not session.closing_reason:
+                if not await scheduler.submit(pipeline.speaker, bytes(1600)):
+                    break
+            return "left"
+
+        task = asyncio.create_task(handler())
+        await asyncio.sleep(0.1)
+        blocked = scheduler.lanes[pipeline.speaker].backpressure_waits > 0 and not task.done()
+
+        session.last_activity = time.monotonic() - 20.0
+        await registry.sweep()
+        try:
+            result = await asyncio.wait_for(task, timeout=1.0)
+        finally:
+            await scheduler.stop()
+        return blocked, result, session
+
+    blocked, result, session = asyncio.run(scenario())
+    assert blocked
+    assert result == "left"
+    assert session.closing_reason == "idle"
+    assert session.websocket.closed_with[0] == 1013
@@ -0,0 +1,113 @@
+"""
+SuggestionScheduler dispatch against the local stub backend.
+"""
+
+import asyncio
+import weakref
+
+import pytest
+
+import suggestion_scheduler
+from suggestion_scheduler import SuggestionScheduler, SuggestionCache, SuggestionBackend, LocalStubBackend
+
+
+def _scheduler(delivered: list) -> SuggestionScheduler:
+    return SuggestionScheduler(
+        on_suggestion=delivered.append,
+        backend=LocalStubBackend(latency_ms=10.0),
+        stable_after=0.05,
+        cache=SuggestionCache(),
+    )
+
+
+def test_repeat_after_delivery_is_not_resent():
+    async def body():
+        delivered = []
+        scheduler = _scheduler(delivered)
+        scheduler.submit("Where is my refund?")
+        await asyncio.sleep(0.1)
+        # The final transcript of an utterance whose interim already finished
+        scheduler.submit("where is my refund")
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+        return delivered, scheduler
+
+    delivered, scheduler = asyncio.run(body())
+    assert len(delivered) == 1
+    assert scheduler.stats["dispatched"] == 1
+    assert scheduler.stats["cache_hits"] == 0
+
+
+def test_repeat_while_running_keeps_request():
+    async def body():
+        delivered = []
+        scheduler = _scheduler(delivered)
+        scheduler.submit("Where is my refund?")
+        scheduler.submit("Where is my refund?")
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+        return delivered, scheduler
+
+    delivered, scheduler = asyncio.run(body())
+    assert len(delivered) == 1
+    assert scheduler.stats["cancelled"] == 0
+
+
+def test_new_utterance_is_dispatched():
+    async def body():
+        delivered = []
+        scheduler = _scheduler(delivered)
+        scheduler.submit("Where is my refund?")
+        await asyncio.sleep(0.1)
+        scheduler.submit("I want to cancel my order")
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+        return delivered
+
+    delivered = asyncio.run(body())
+    assert [item["utterance"] for item in delivered] == ["Where is my refund?", "I want to cancel my order"]
+
+
+class CountingBackend(SuggestionBackend):
+    """Records how many requests run at once."""
+
+    name = "counting"
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def generate(self, request):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.02)
+        self.running -= 1
+        return request["text"]
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SuggestionBackend()
+
+
+def test_concurrency_limit_holds_on_every_event_loop(monkeypatch):
+    monkeypatch.setenv("SUGGESTION_MAX_CONCURRENCY", "1")
+    monkeypatch.setattr(suggestion_scheduler, "_concurrency_limits", weakref.WeakKeyDictionary())
+
+    async def contended_calls():
+        delivered = []
+        backend = CountingBackend()
+        schedulers = [
+            SuggestionScheduler(on_suggestion=delivered.append, backend=backend, cache=SuggestionCache())
+            for _ in range(3)
+        ]
+        for index, scheduler in enumerate(schedulers):
+            scheduler.submit(f"utterance {index}")
+        await asyncio.sleep(0.2)
+        for scheduler in schedulers:
+            await scheduler.close()
+        return len(delivered), backend.peak, sum(scheduler.stats["errors"] for scheduler in schedulers)
+
+    # A worker restart or a second test client runs on a fresh loop
+    for _ in range(2):
+        assert asyncio.run(contended_calls()) == (3, 1, 0)
@@ -0,0 +1,131 @@
+"""
+UpstreamScheduler tests, with the default rate and burst settings unless noted.
+"""
+
+import time
+import asyncio
+
+import pytest
+
+from upstream_scheduler import UpstreamScheduler, REALTIME_BYTES_PER_SECOND
+
+
+class Recorder:
+    """Upstream send stub that records when each chunk went out."""
+
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency
+        self.sent = []
+
+    async def __call__(self, chunk: bytes):
+        await asyncio.sleep(self.latency)
+        self.sent.append((time.monotonic(), len(chunk)))
+
+
+async def _submit(scheduler: UpstreamScheduler, lane: str, data: bytes) -> bool:
+    # A stalled dispatcher blocks submit() forever; fail instead of hanging
+    return await asyncio.wait_for(scheduler.submit(lane, data), timeout=2.0)
+
+
+def _scheduler() -> UpstreamScheduler:
+    return UpstreamScheduler(rate_headroom=1.25, burst_seconds=2.0, max_queue_seconds=1.0)
+
+
+def test_large_chunk_is_sent_without_further_wakeups():
+    async def scenario():
+        scheduler = _scheduler()
+        recorder = Recorder()
+        await scheduler.register("call", recorder)
+        try:
+            assert await _submit(scheduler, "call", bytes(16000))
+            await asyncio.sleep(0.2)
+        finally:
+            await scheduler.stop()
+        return recorder.sent
+
+    sent = asyncio.run(scenario())
+    assert [size for _, size in sent] == [16000]
+
+
+@pytest.mark.parametrize("chunk_bytes", [5120, 10240])
+def test_single_lane_realtime_stream_keeps_up(chunk_bytes):
+    # 160 ms and 320 ms chunks, submitted at real-time pace
+    chunks = 6
+    interval = chunk_bytes / REALTIME_BYTES_PER_SECOND
+
+    async def scenario():
+        scheduler = _scheduler()
+        recorder = Recorder()
+        await scheduler.register("call", recorder)
+        submitted, blocked = [], []
+        try:
+            for _ in range(chunks):
+                started = time.monotonic()
+                assert await _submit(scheduler, "call", bytes(chunk_bytes))
+                submitted.append(started)
+                blocked.append(time.monotonic() - started)
+                await asyncio.sleep(interval)
+            await asyncio.sleep(0.1)
+        finally:
+            await scheduler.stop()
+        return submitted, blocked, recorder.sent
+
+    submitted, blocked, sent = asyncio.run(scenario())
+    assert len(sent) == chunks
+    assert max(blocked) < 0.05
+    # Every chunk goes out right after its own submit, not one chunk late
+    for submit_time, (sent_time, size) in zip(submitted, sent):
+        assert size == chunk_bytes
+        assert sent_time - submit_time < 0.1
+
+
+def test_small_chunk_lane_not_starved_by_large_chunk_lane():
+    async def scenario():
+        scheduler = _scheduler()
+        large, small = Recorder(), Recorder()
+        await scheduler.register("large", large)
+        await scheduler.register("small", small)
+        try:
+            for _ in range(3):
+                await _submit(scheduler, "large", bytes(10240))
+                await _submit(scheduler, "small", bytes(1024))
+            await asyncio.sleep(0.3)
+        finally:
+            await scheduler.stop()
+        return large.sent, small.sent
+
+    large_sent, small_sent = asyncio.run(scenario())
+    assert len(large_sent) == 3
+    assert len(small_sent) == 3
+
+
+def test_byte_share_is_equal_across_chunk_sizes():
+    # A short burst so the run measures the sustained rate, not the bucket
+    duration = 1.5
+
+    async def keep_full(scheduler, lane, chunk_bytes):
+        while True:
+            await scheduler.submit(lane, bytes(chunk_bytes))
+
+    async def scenario():
+        scheduler = UpstreamScheduler(rate_headroom=1.0, burst_seconds=0.05, max_queue_seconds=1.0)
+        large, small = Recorder(latency=0.001), Recorder(latency=0.001)
+        await scheduler.register("large", large)
+        await scheduler.register("small", small)
+        feeders = [
+            asyncio.create_task(keep_full(scheduler, "large", 10240)),
+            asyncio.create_task(keep_full(scheduler, "small", 1024)),
+        ]
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            for feeder in feeders:
+                feeder.cancel()
+            await scheduler.stop()
+        return sum(size for _, size in large.sent), sum(size for _, size in small.sent)
+
+    large_bytes, small_bytes = asyncio.run(scenario())
+    expected = REALTIME_BYTES_PER_SECOND * duration
+    # Both lanes get the real-time byte rate; the large lane may be one chunk ahead
+    assert abs(small_bytes - expected) < 0.1 * expected
+    assert abs(large_bytes - small_bytes) <= 10240 + 0.1 * expected
@@ -0,0 +1,77 @@
+"""
+/ws channel layout validation: requests are refused before any pipeline opens.
+"""
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("HUME_WARMUP", "0")
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _rejection(client, query: str):
+    with client.websocket_connect(f"/ws?{query}") as websocket:
+        message = websocket.receive_json()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    return message, closed.value.code
+
+
+def test_channels_above_limit_are_rejected(client):
+    message, code = _rejection(client, "channels=64")
+    assert message["type"] == "error"
+    assert message["code"] == "invalid_layout"
+    assert code == 1008
+
+
+def test_channel_limit_follows_setting(client, monkeypatch):
+    monkeypatch.setenv("MAX_INGEST_CHANNELS", "1")
+    message, code = _rejection(client, "channels=2&speakers=agent,customer")
+    assert message["code"] == "invalid_layout"
+    assert code == 1008
+
+
+def test_duplicate_speakers_are_rejected(client):
+    message, code = _rejection(client, "channels=2&speakers=customer,customer")
+    assert message["code"] == "invalid_layout"
+    assert "unique" in message["message"]
+    assert code == 1008
+
+
+def test_customer_only_without_customer_speaker_is_rejected(client):
+    message, code = _rejection(client, "channels=2&speakers=a,b&mode=customer_only")
+    assert message["code"] == "invalid_layout"
+    assert "customer" in message["message"]
+    assert code == 1008
+
+
+def test_customer_only_builds_customer_pipeline_with_configured_hold(client, monkeypatch):
+    built = {}
+
+    class RecordingFeed(main.SpeakerFeed):
+        def __init__(self, send_json, hold_seconds):
+            super().__init__(send_json, hold_seconds=hold_seconds)
+            built["hold_seconds"] = hold_seconds
+
+    class StubPipeline:
+        def __init__(self, session_id, speaker, *args, **kwargs):
+            built.setdefault("speakers", []).append(speaker)
+
+    class FullRegistry:
+        def can_admit(self, session):
+            return False
+
+    monkeypatch.setenv("SPEAKER_FEED_HOLD_SECONDS", "0.25")
+    monkeypatch.setattr(main, "SpeakerFeed", RecordingFeed)
+    monkeypatch.setattr(main, "ChannelPipeline", StubPipeline)
+    monkeypatch.setattr(main, "get_session_registry", lambda: FullRegistry())
+    message, code = _rejection(client, "channels=2&speakers=agent,customer&mode=customer_only")
+    assert message["code"] == "over_capacity"
+    assert built == {"hold_seconds": 0.25, "speakers": ["customer"]}
@@ -0,0 +1,286 @@
+"""
+Fair upstream scheduling of audio sends across concurrent calls.
+
+All calls on a worker share one UpstreamScheduler. Each session gets a
+lane with a bounded queue and a token bucket pegged to real-time audio
+(16 kHz x 2 bytes). A single dispatcher serves lanes round robin, one chunk
+per lane per pass with at most one send in flight per lane. Byte fairness
+comes from the buckets: every lane is held to the same byte rate whatever
+its chunk size, so a bursting client can only delay itself. When a lane's
+queue is full, submit() waits, which stops reading from that client's
+socket and pushes back on it instead of buffering without limit.
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Optional, Callable, Dict, Any
+
+from settings import env_float
+
+
+REALTIME_BYTES_PER_SECOND = 16000 * 2  # 16 kHz, PCM 16-bit, mono
+
+
+class TokenBucket:
+    """Token bucket measured in bytes."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_consume(self, amount: int) -> bool:
+        """Take `amount` tokens if available."""
+        self._refill(time.monotonic())
+        # A chunk larger than the whole bucket is let through once it is full
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            self.tokens -= amount
+            return True
+        return False
+
+    def time_until(self, amount: int) -> float:
+        """Seconds until `amount` tokens will be available."""
+        self._refill(time.monotonic())
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+
+class SessionLane:
+    """Per-session queue, rate limit and counters."""
+
+    def __init__(self, session_id: str, send: Callable, bucket: TokenBucket, max_queued_bytes: int):
+        self.session_id = session_id
+        self.send = send
+        self.bucket = bucket
+        self.max_queued_bytes = max_queued_bytes
+        self.queue: deque = deque()
+        self.queued_bytes = 0
+        self.in_flight: Optional[asyncio.Task] = None
+        self.space = asyncio.Event()
+        self.space.set()
+        self.closed = False
+        self.throttled = False
+        # Counters
+        self.bytes_sent = 0
+        self.chunks_sent = 0
+        self.throttle_events = 0
+        self.backpressure_waits = 0
+        self.send_latency_ewma = 0.0
+        self.registered_at = time.monotonic()
+
+    def snapshot(self, total_bytes_sent: int) -> Dict[str, Any]:
+        age = max(time.monotonic() - self.registered_at, 1e-6)
+        return {
+            "bytes_sent": self.bytes_sent,
+            "chunks_sent": self.chunks_sent,
+            "share": round(self.bytes_sent / total_bytes_sent, 4) if total_bytes_sent else 0.0,
+            "realtime_factor": round(self.bytes_sent / age / REALTIME_BYTES_PER_SECOND, 3),
+            "queued_bytes": self.queued_bytes,
+            "queued_chunks": len(self.queue),
+            "throttled": self.throttled,
+            "throttle_events": self.throttle_events,
+            "backpressure_waits": self.backpressure_waits,
+            "send_latency_ms": round(self.send_latency_ewma * 1000.0, 2),
+        }
+
+
+class UpstreamScheduler:
+    """Worker-level round robin scheduler for upstream audio sends."""
+
+    def __init__(
+        self,
+        rate_headroom: Optional[float] = None,
+        burst_seconds: Optional[float] = None,
+        max_queue_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            rate_headroom: Multiple of real-time audio rate a session may send
+                at (lets a lane catch up after jitter). If None, read from
+                UPSTREAM_RATE_HEADROOM (default: 1.25).
+            burst_seconds: Bucket capacity in seconds of audio. If None, read
+                from UPSTREAM_BURST_SECONDS (default: 2.0).
+            max_queue_seconds: Audio a lane may queue before submit() blocks.
+                If None, read from UPSTREAM_MAX_QUEUE_SECONDS (default: 1.0).
+        """
+        headroom = rate_headroom if rate_headroom is not None else env_float("UPSTREAM_RATE_HEADROOM", 1.25)
+        burst = burst_seconds if burst_seconds is not None else env_float("UPSTREAM_BURST_SECONDS", 2.0)
+        queue_seconds = (
+            max_queue_seconds if max_queue_seconds is not None else env_float("UPSTREAM_MAX_QUEUE_SECONDS", 1.0)
+        )
+        self.rate = REALTIME_BYTES_PER_SECOND * headroom
+        self.capacity = REALTIME_BYTES_PER_SECOND * burst
+        self.max_queued_bytes = int(REALTIME_BYTES_PER_SECOND * queue_seconds)
+        self.lanes: Dict[str, SessionLane] = {}
+        self.total_bytes_sent = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self):
+        """Start the dispatcher on the running loop."""
+        if self.is_running:
+            return
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        """Stop the dispatcher and drop every lane."""
+        for session_id in list(self.lanes):
+            await self.unregister(session_id)
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+    async def register(self, session_id: str, send: Callable) -> SessionLane:
+        """
+        Create a lane for a session.
+
+        Args:
+            session_id: Session identifier
+            send: Async callable taking one PCM chunk (e.g. HumeAIClient.send_audio)
+
+        Returns:
+            The session's lane
+        """
+        await self.start()
+        lane = SessionLane(session_id, send, TokenBucket(self.rate, self.capacity), self.max_queued_bytes)
+        self.lanes[session_id] = lane
+        return lane
+
+    async def unregister(self, session_id: str):
+        """Drop a session's lane, its queued audio and any in-flight send."""
+        lane = self.lanes.pop(session_id, None)
+        if lane is None:
+            return
+        lane.closed = True
+        lane.queue.clear()
+        lane.queued_bytes = 0
+        lane.space.set()  # release a blocked submit()
+        if lane.in_flight and not lane.in_flight.done():
+            lane.in_flight.cancel()
+            try:
+                await lane.in_flight
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, session_id: str, data: bytes) -> bool:
+        """
+        Queue a chunk for upstream delivery, waiting while the lane is full.
+
+        Returns:
+            False if the session has no lane (chunk dropped), True otherwise
+        """
+        lane = self.lanes.get(session_id)
+        if lane is None:
+            return False
+        while lane.queue and lane.queued_bytes + len(data) > lane.max_queued_bytes:
+            lane.backpressure_waits += 1
+            lane.space.clear()
+            await lane.space.wait()
+            if lane.closed:
+                return False
+        lane.queue.append(data)
+        lane.queued_bytes += len(data)
+        self._wakeup.set()
+        return True
+
+    async def _dispatch_loop(self):
+        while True:
+            self._wakeup.clear()
+            next_wake = self._dispatch_round()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wake)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch_round(self) -> Optional[float]:
+        """
+        Run one round robin pass: each idle lane with queued audio sends its
+        next chunk if its bucket allows.
+
+        Returns:
+            Seconds until a throttled lane can send again, or None to wait
+            for the next submit/send completion
+        """
+        next_wake = None
+        lanes = list(self.lanes.values())
+        for lane in lanes:
+            if not lane.queue or lane.in_flight is not None:
+                continue
+            size = len(lane.queue[0])
+            if not lane.bucket.try_consume(size):
+                if not lane.throttled:
+                    lane.throttled = True
+                    lane.throttle_events += 1
+                wait = lane.bucket.time_until(size)
+                next_wake = wait if next_wake is None else min(next_wake, wait)
+                continue
+            lane.throttled = False
+            chunk = lane.queue.popleft()
+            lane.queued_bytes -= size
+            lane.space.set()
+            lane.in_flight = asyncio.create_task(self._send(lane, chunk))
+
+        # Rotate so the next pass starts with a different lane
+        if len(lanes) > 1:
+            first = lanes[0].session_id
+            self.lanes[first] = self.lanes.pop(first)
+        return next_wake
+
+    async def _send(self, lane: SessionLane, chunk: bytes):
+        started = time.perf_counter()
+        try:
+            await lane.send(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Upstream send failed for session {lane.session_id}: {e}")
+        else:
+            lane.bytes_sent += len(chunk)
+            lane.chunks_sent += 1
+            self.total_bytes_sent += len(chunk)
+            latency = time.perf_counter() - started
+            lane.send_latency_ewma = latency if lane.chunks_sent == 1 else 0.9 * lane.send_latency_ewma + 0.1 * latency
+        finally:
+            lane.in_flight = None
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-session share and throttle counters for diagnostics."""
+        return {
+            "rate_bytes_per_second": self.rate,
+            "burst_bytes": self.capacity,
+            "max_queued_bytes": self.max_queued_bytes,
+            "total_bytes_sent": self.total_bytes_sent,
+            "sessions": {
+                session_id: lane.snapshot(self.total_bytes_sent)
+                for session_id, lane in self.lanes.items()
+            },
+        }
+
+
+_scheduler: Optional[UpstreamScheduler] = None
+
+
+def get_upstream_scheduler() -> UpstreamScheduler:
+    """Return the worker-wide upstream scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = UpstreamScheduler()
+    return _scheduler
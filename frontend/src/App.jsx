@@ -3,12 +3,17 @@ import WebSocketClient from './utils/websocket'
 import ConnectionStatus from './components/ConnectionStatus'
 import AudioCapture from './components/AudioCapture'
 import Transcript from './components/Transcript'
+import Suggestions from './components/Suggestions'
+import EmotionIndicator from './components/EmotionIndicator'
 import useAudioCapture from './hooks/useAudioCapture'
+import { DEFAULT_CODEC } from './utils/audioCodecs'
 
 function App() {
   const [isConnected, setIsConnected] = useState(false)
   const [messages, setMessages] = useState([])
   const [transcripts, setTranscripts] = useState([])
+  const [suggestions, setSuggestions] = useState([])
+  const [emotion, setEmotion] = useState(null)
   const wsClientRef = useRef(null)
   
   // Audio capture hook - will be updated when WebSocket connects
@@ -19,11 +24,14 @@ function App() {
     startCapture,
     stopCapture,
     setWsClient,
+    setCodec,
+    setChunkMs,
+    setPaused,
   } = useAudioCapture()
 
   useEffect(() => {
     // Initialize WebSocket client
-    const wsUrl = 'ws://localhost:8000/ws'
+    const wsUrl = `ws://localhost:8000/ws?codec=${DEFAULT_CODEC}&control=1`
     wsClientRef.current = new WebSocketClient(wsUrl)
 
     // Set up event listeners
@@ -35,6 +43,9 @@ function App() {
       if (setWsClient) {
         setWsClient(wsClientRef.current)
       }
+      // Hold audio until the server acknowledges the codec for this connection
+      setCodec(null)
+      setPaused(false)
       
       // Send a test message after connection
       setTimeout(() => {
@@ -62,6 +73,29 @@ function App() {
       try {
         const parsed = JSON.parse(data)
         console.log('Parsed JSON message:', parsed)
+        if (parsed.type === 'codec') {
+          console.log(`🎚️ Ingest codec: ${parsed.codec} (requested ${parsed.requested})`)
+          setCodec(parsed.codec)
+          if (parsed.control) {
+            setChunkMs(parsed.control.chunk_ms)
+          }
+          return
+        }
+        if (parsed.type === 'ping') {
+          wsClientRef.current.send(JSON.stringify({ type: 'pong', id: parsed.id }))
+          return
+        }
+        if (parsed.type === 'control') {
+          // Apply, then ack: for a codec switch the ack must precede the
+          // first frame in the new codec, so the server swaps decoders in step
+          console.log(`🎛️ Control: ${parsed.action}`, parsed.chunk_ms || parsed.codec || '', `(${parsed.reason})`)
+          if (parsed.action === 'chunk') setChunkMs(parsed.chunk_ms)
+          else if (parsed.action === 'pause') setPaused(true)
+          else if (parsed.action === 'resume') setPaused(false)
+          else if (parsed.action === 'codec') setCodec(parsed.codec)
+          wsClientRef.current.send(JSON.stringify({ type: 'control_ack', id: parsed.id }))
+          return
+        }
         if (parsed.type === 'transcription') {
           // Handle transcription message
           console.log('📝 Received transcription:', parsed.text)
@@ -69,11 +103,37 @@ function App() {
             ...prev,
             {
               text: parsed.text,
+              speaker: parsed.speaker,
               timestamp: parsed.timestamp || Date.now(),
             },
           ])
           return
         }
+        if (parsed.type === 'prosody') {
+          // Provisional hints only while the customer is speaking; Hume's scores win otherwise
+          if (parsed.speaking && (parsed.speaker || 'customer') === 'customer') {
+            setEmotion(parsed)
+          }
+          return
+        }
+        if (parsed.type === 'emotion') {
+          if ((parsed.speaker || 'customer') === 'customer') {
+            setEmotion(parsed)
+          }
+          return
+        }
+        if (parsed.type === 'suggestion') {
+          // Keep only the most recent suggestions
+          setSuggestions((prev) => [
+            {
+              text: parsed.text,
+              emotion: parsed.emotion,
+              timestamp: parsed.timestamp || Date.now(),
+            },
+            ...prev,
+          ].slice(0, 5))
+          return
+        }
       } catch (e) {
         // Not JSON, treat as regular text message
         console.log('Not JSON, treating as text:', data)
@@ -137,8 +197,12 @@ function App() {
         onStop={stopCapture}
       />
 
+      <EmotionIndicator emotion={emotion} />
+
       <Transcript transcripts={transcripts} />
 
+      <Suggestions suggestions={suggestions} />
+
       <div style={{ marginTop: '20px' }}>
         <h3>Messages:</h3>
         <div
@@ -0,0 +1,65 @@
+import React from 'react'
+
+function Meter({ label, value }) {
+  const percent = Math.round((value || 0) * 100)
+  const color = percent > 70 ? '#dc3545' : percent > 40 ? '#ffc107' : '#28a745'
+  return (
+    <div style={{ marginBottom: '8px' }}>
+      <div style={{ fontSize: '14px', color: '#666', marginBottom: '3px' }}>
+        {label}: {percent}%
+      </div>
+      <div style={{ height: '8px', backgroundColor: '#e0e0e0', borderRadius: '4px' }}>
+        <div
+          style={{
+            width: `${percent}%`,
+            height: '100%',
+            backgroundColor: color,
+            borderRadius: '4px',
+            transition: 'width 0.1s linear',
+          }}
+        />
+      </div>
+    </div>
+  )
+}
+
+function EmotionIndicator({ emotion }) {
+  return (
+    <div
+      style={{
+        padding: '20px',
+        border: '1px solid #ddd',
+        borderRadius: '8px',
+        marginTop: '20px',
+        backgroundColor: '#f9f9f9',
+      }}
+    >
+      <h3 style={{ marginTop: 0, marginBottom: '15px' }}>
+        Customer Emotion{' '}
+        {emotion && (
+          <span style={{ fontSize: '12px', color: '#666', fontWeight: 'normal' }}>
+            {emotion.provisional ? '(live estimate)' : '(confirmed by Hume)'}
+          </span>
+        )}
+      </h3>
+
+      {!emotion ? (
+        <p style={{ color: '#666', fontStyle: 'italic' }}>Waiting for audio...</p>
+      ) : (
+        <div>
+          <Meter label="Arousal" value={emotion.arousal} />
+          <Meter label="Agitation" value={emotion.agitation} />
+          {emotion.emotions && (
+            <div style={{ fontSize: '14px', color: '#333' }}>
+              {Object.entries(emotion.emotions)
+                .map(([name, score]) => `${name} ${Math.round(score * 100)}%`)
+                .join(' · ')}
+            </div>
+          )}
+        </div>
+      )}
+    </div>
+  )
+}
+
+export default EmotionIndicator
@@ -0,0 +1,49 @@
+import React from 'react'
+
+function Suggestions({ suggestions }) {
+  return (
+    <div
+      style={{
+        padding: '20px',
+        border: '1px solid #ddd',
+        borderRadius: '8px',
+        marginTop: '20px',
+        backgroundColor: '#fffde7',
+        maxHeight: '300px',
+        overflowY: 'auto',
+      }}
+    >
+      <h3 style={{ marginTop: 0, marginBottom: '15px' }}>Suggestions</h3>
+
+      {suggestions.length === 0 ? (
+        <p style={{ color: '#666', fontStyle: 'italic' }}>
+          Suggestions will appear here once the customer finishes speaking...
+        </p>
+      ) : (
+        <div>
+          {suggestions.map((suggestion, index) => (
+            <div
+              key={index}
+              style={{
+                marginBottom: '10px',
+                padding: '10px',
+                backgroundColor: '#fff',
+                borderRadius: '4px',
+                border: '1px solid #e0e0e0',
+              }}
+            >
+              {suggestion.emotion && (
+                <div style={{ fontSize: '14px', color: '#666', marginBottom: '5px' }}>
+                  Emotion: {suggestion.emotion}
+                </div>
+              )}
+              <div style={{ fontSize: '16px', color: '#333' }}>{suggestion.text}</div>
+            </div>
+          ))}
+        </div>
+      )}
+    </div>
+  )
+}
+
+export default Suggestions
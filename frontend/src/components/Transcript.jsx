@@ -33,6 +33,11 @@ function Transcript({ transcripts }) {
               }}
             >
               <div style={{ fontSize: '14px', color: '#666', marginBottom: '5px' }}>
+                {transcript.speaker && (
+                  <strong style={{ textTransform: 'capitalize', marginRight: '8px' }}>
+                    {transcript.speaker}
+                  </strong>
+                )}
                 {new Date(transcript.timestamp).toLocaleTimeString()}
               </div>
               <div style={{ fontSize: '16px', color: '#333' }}>{transcript.text}</div>
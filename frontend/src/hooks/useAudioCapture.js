@@ -1,4 +1,5 @@
 import { useState, useEffect, useRef, useCallback } from 'react'
+import { createEncoder } from '../utils/audioCodecs'
 
 function useAudioCapture() {
   const [isCapturing, setIsCapturing] = useState(false)
@@ -12,13 +13,43 @@ function useAudioCapture() {
   const audioConfigRef = useRef({
     sampleRate: 16000, // Target sample rate
     channels: 1, // Mono
-    bufferSize: 4096, // Buffer size for processing
+    bufferSize: 1024, // Processor callback size (~21 ms at 48 kHz); chunks are built from these
   })
   
+  // Encoder for the codec the server acknowledged; null until the ack arrives
+  const encoderRef = useRef(null)
+  
+  // Chunking is driven by the server's control channel: samples accumulate
+  // until a chunk of chunkMs is ready, and nothing is sent while paused
+  const chunkMsRef = useRef(80)
+  const pausedRef = useRef(false)
+  const pendingRef = useRef({ parts: [], length: 0 })
+  
+  const clearPending = () => {
+    pendingRef.current = { parts: [], length: 0 }
+  }
+  
   const setWsClient = useCallback((wsClient) => {
     wsClientRef.current = wsClient
   }, [])
 
+  // Called with the server-acknowledged codec (or null on reconnect, which
+  // holds audio back so stateful codecs restart in sync with the server)
+  const setCodec = useCallback((codec) => {
+    encoderRef.current = codec ? createEncoder(codec) : null
+    if (!codec) clearPending()
+  }, [])
+
+  const setChunkMs = useCallback((chunkMs) => {
+    chunkMsRef.current = chunkMs
+  }, [])
+
+  const setPaused = useCallback((paused) => {
+    pausedRef.current = paused
+    // Audio captured during a pause is dropped, not sent late
+    clearPending()
+  }, [])
+
   const startCapture = useCallback(async () => {
     try {
       setError(null)
@@ -82,17 +113,35 @@ function useAudioCapture() {
           int16Array[i] = s < 0 ? s * 0x8000 : s * 0x7FFF
         }
 
-        // Send audio chunk via WebSocket if connected
-        if (wsClientRef.current && wsClientRef.current.isConnected()) {
-          try {
-            wsClientRef.current.send(int16Array.buffer) // Send as ArrayBuffer (binary)
-            // Log occasionally to avoid spam (every 50 chunks)
-            if (Math.random() < 0.02) {
-              console.log(`📤 Sent audio chunk: ${int16Array.length} samples (${targetSampleRate} Hz)`)
-            }
-          } catch (error) {
-            console.error('Error sending audio chunk:', error)
+        // Send audio once the codec is negotiated, a full chunk is ready and
+        // the server has not paused us
+        const encoder = encoderRef.current
+        if (!encoder || pausedRef.current || !wsClientRef.current || !wsClientRef.current.isConnected()) {
+          return
+        }
+        const pending = pendingRef.current
+        pending.parts.push(int16Array)
+        pending.length += int16Array.length
+        const chunkSamples = Math.round((chunkMsRef.current * targetSampleRate) / 1000)
+        if (pending.length < chunkSamples) return
+
+        const chunk = new Int16Array(pending.length)
+        let offset = 0
+        for (const part of pending.parts) {
+          chunk.set(part, offset)
+          offset += part.length
+        }
+        clearPending()
+
+        try {
+          const payload = encoder.encode(chunk)
+          wsClientRef.current.send(payload) // Send as ArrayBuffer (binary)
+          // Log occasionally to avoid spam (every 50 chunks)
+          if (Math.random() < 0.02) {
+            console.log(`📤 Sent audio chunk: ${chunk.length} samples (${targetSampleRate} Hz, ${encoder.codec}, ${chunkMsRef.current} ms, ${payload.byteLength} bytes)`)
           }
+        } catch (error) {
+          console.error('Error sending audio chunk:', error)
         }
       }
 
@@ -109,6 +158,7 @@ function useAudioCapture() {
         resampling: actualSampleRate !== targetSampleRate ? `Yes (${actualSampleRate} → ${targetSampleRate} Hz)` : 'No',
         channels: stream.getAudioTracks()[0]?.getSettings(),
         bufferSize: bufferSize,
+        chunkMs: chunkMsRef.current,
       })
 
       return stream
@@ -154,6 +204,7 @@ function useAudioCapture() {
 
     setIsCapturing(false)
     isCapturingRef.current = false
+    clearPending()
     console.log('Audio capture stopped')
   }, [])
 
@@ -189,6 +240,9 @@ function useAudioCapture() {
     startCapture,
     stopCapture,
     setWsClient,
+    setCodec,
+    setChunkMs,
+    setPaused,
     stream: streamRef.current,
     audioContext: audioContextRef.current,
   }
@@ -0,0 +1,137 @@
+// Ingest codecs for audio sent to the backend.
+// Must stay in sync with the decoders in backend/audio_processor.py.
+
+export const SUPPORTED_CODECS = ['pcm16', 'mulaw', 'alaw', 'ima_adpcm']
+
+// Codec requested from the server at connect time (override with VITE_AUDIO_CODEC)
+export const DEFAULT_CODEC = import.meta.env.VITE_AUDIO_CODEC || 'mulaw'
+
+const MULAW_BIAS = 0x84
+const MULAW_CLIP = 32635
+
+function linearToMulaw(sample) {
+  const sign = sample < 0 ? 0x80 : 0
+  if (sign) sample = -sample
+  if (sample > MULAW_CLIP) sample = MULAW_CLIP
+  sample += MULAW_BIAS
+
+  let exponent = 7
+  for (let mask = 0x4000; (sample & mask) === 0 && exponent > 0; exponent--, mask >>= 1) {}
+  const mantissa = (sample >> (exponent + 3)) & 0x0f
+  return ~(sign | (exponent << 4) | mantissa) & 0xff
+}
+
+const ALAW_SEGMENT_END = [0x1f, 0x3f, 0x7f, 0xff, 0x1ff, 0x3ff, 0x7ff, 0xfff]
+
+function linearToAlaw(sample) {
+  let value = sample >> 3
+  let mask = 0xd5
+  if (value < 0) {
+    mask = 0x55
+    value = -value - 1
+  }
+
+  let segment = 0
+  while (segment < 8 && value > ALAW_SEGMENT_END[segment]) segment++
+  if (segment >= 8) return 0x7f ^ mask
+
+  let code = segment << 4
+  code |= segment < 2 ? (value >> 1) & 0x0f : (value >> segment) & 0x0f
+  return code ^ mask
+}
+
+const IMA_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8]
+const IMA_STEP_TABLE = [
+  7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+  50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+  253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+  1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+  3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+  11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+  32767,
+]
+
+function createTableEncoder(codec, encodeSample) {
+  return {
+    codec,
+    encode(int16Array) {
+      const out = new Uint8Array(int16Array.length)
+      for (let i = 0; i < int16Array.length; i++) {
+        out[i] = encodeSample(int16Array[i])
+      }
+      return out.buffer
+    },
+  }
+}
+
+// Streaming IMA-ADPCM: 4 bits per sample, low nibble first, state carried across
+// frames. An odd trailing sample is held back until the next frame.
+function createImaAdpcmEncoder() {
+  let predictor = 0
+  let index = 0
+  let pending = null
+
+  const encodeSample = (sample) => {
+    const step = IMA_STEP_TABLE[index]
+    let diff = sample - predictor
+    let code = 0
+    if (diff < 0) {
+      code = 8
+      diff = -diff
+    }
+
+    let delta = step >> 3
+    if (diff >= step) {
+      code |= 4
+      diff -= step
+      delta += step
+    }
+    if (diff >= step >> 1) {
+      code |= 2
+      diff -= step >> 1
+      delta += step >> 1
+    }
+    if (diff >= step >> 2) {
+      code |= 1
+      delta += step >> 2
+    }
+
+    predictor += code & 8 ? -delta : delta
+    predictor = Math.max(-32768, Math.min(32767, predictor))
+    index = Math.max(0, Math.min(88, index + IMA_INDEX_TABLE[code]))
+    return code
+  }
+
+  return {
+    codec: 'ima_adpcm',
+    encode(int16Array) {
+      const codes = []
+      if (pending !== null) codes.push(pending)
+      for (let i = 0; i < int16Array.length; i++) {
+        codes.push(encodeSample(int16Array[i]))
+      }
+      pending = codes.length % 2 ? codes.pop() : null
+
+      const out = new Uint8Array(codes.length / 2)
+      for (let i = 0; i < out.length; i++) {
+        out[i] = codes[2 * i] | (codes[2 * i + 1] << 4)
+      }
+      return out.buffer
+    },
+  }
+}
+
+export function createEncoder(codec) {
+  switch (codec) {
+    case 'pcm16':
+      return { codec, encode: (int16Array) => int16Array.buffer }
+    case 'mulaw':
+      return createTableEncoder(codec, linearToMulaw)
+    case 'alaw':
+      return createTableEncoder(codec, linearToAlaw)
+    case 'ima_adpcm':
+      return createImaAdpcmEncoder()
+    default:
+      throw new Error(`Unsupported audio codec: ${codec}`)
+  }
+}